@@ -0,0 +1,41 @@
+"""
+Per-page decode cost of nfts/search responses: the old repeated response.json() calls,
+a single stdlib json.loads, and a single orjson.loads (when installed).
+
+    python -m benchmarks.bench_decode
+"""
+import json
+import timeit
+from benchmarks.fixtures import search_page
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def legacy(body: bytes):
+    return json.loads(body)["results"] if json.loads(body)["results"] else json.loads(body)
+
+def once(loads):
+    def decode(body: bytes):
+        data = loads(body)
+        return data["results"] if data["results"] else data
+    return decode
+
+def main():
+    decoders = {"repeated json": legacy, "json once": once(json.loads)}
+    if orjson:
+        decoders["orjson once"] = once(orjson.loads)
+
+    print(f"{'items':>6} {'bytes':>9}  " + "  ".join(f"{name:>16}" for name in decoders))
+    for size in (20, 100, 500):
+        body = json.dumps(search_page(size)).encode()
+        cells = []
+        for decode in decoders.values():
+            number, _ = timeit.Timer(lambda: decode(body)).autorange()
+            best = min(timeit.repeat(lambda: decode(body), number=number, repeat=5)) / number
+            cells.append(f"{best * 1e6:>13.1f} us")
+        print(f"{size:>6} {len(body):>9}  " + "  ".join(cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Filtering a 5,000-item scan: a Python loop over dicts versus GiftFrame (building the frame, then a
+vectorized filter + top 20 by drop percent). A frame queried once costs build + query; "break-even"
+is the number of queries on one frame from which it beats running the dict loop for each of them.
+Needs numpy.
+
+    python -m benchmarks.bench_frame
+"""
+import math
+import timeit
+from benchmarks.fixtures import search_page
+from portalsmp.frame import GiftFrame
+
+MIN_DROP, MAX_PRICE, MAX_RARITY = 15, 100, 10
+
+def rarity(nft: dict, kind: str):
+    for attr in nft["attributes"]:
+        if attr["type"] == kind:
+            return attr["rarity_per_mille"]
+    return None
+
+def dict_loop(items: list) -> list:
+    out = []
+    for nft in items:
+        price, floor = float(nft["price"]), float(nft["floor_price"])
+        drop = 100 * (1 - price / floor) if floor > 0 else 0
+        model_rarity = rarity(nft, "model")
+        if drop >= MIN_DROP and price <= MAX_PRICE and model_rarity is not None and model_rarity <= MAX_RARITY:
+            out.append((drop, nft))
+    out.sort(key=lambda pair: -pair[0])
+    return [nft for _, nft in out[:20]]
+
+def frame_query(frame: GiftFrame) -> list:
+    return frame.where(min_drop=MIN_DROP, max_price=MAX_PRICE, max_model_rarity=MAX_RARITY).top_k(20, "drop_percent").items()
+
+def best(fn) -> float:
+    number, _ = timeit.Timer(fn).autorange()
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+def main():
+    print(f"{'items':>6} {'dict loop':>11} {'build frame':>12} {'frame query':>12} {'build+query':>12} {'break-even':>11}")
+    for n in (500, 5000, 20000):
+        items = search_page(n)["results"]
+        frame = GiftFrame(items)
+        assert [g["id"] for g in dict_loop(items)] == [g["id"] for g in frame_query(frame)]
+        loop = best(lambda: dict_loop(items))
+        build = best(lambda: GiftFrame(items))
+        query = best(lambda: frame_query(frame))
+        queries = math.ceil(build / (loop - query)) if loop > query else None
+        print(f"{n:>6} {loop * 1e3:>9.2f}ms {build * 1e3:>10.2f}ms {query * 1e3:>10.3f}ms {(build + query) * 1e3:>10.2f}ms "
+              f"{queries or '-':>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Memory, construction and attribute-access cost of PortalsGift for 10k gifts, against the previous
+class (which kept the API dict, re-parsed prices on every read and re-scanned attributes on every
+access of a model, symbol or backdrop field). Fails if the slotted class retains more memory or
+reads fields slower than the previous one, or if toDict() does not give back the API dict.
+
+    python -m benchmarks.bench_gift
+"""
+import gc
+import json
+import timeit
+import tracemalloc
+from benchmarks.fixtures import search_page
+from portalsmp.portalsapi import PortalsGift
+
+class LegacyPortalsGift:
+    def __init__(self, data: dict):
+        self.__dict__ = data
+
+    @property
+    def name(self):
+        return self.__dict__["name"]
+
+    @property
+    def price(self):
+        return float(self.__dict__["price"]) if self.__dict__["price"] else None
+
+    @property
+    def floor_price(self):
+        return float(self.__dict__["floor_price"]) if self.__dict__["floor_price"] else None
+
+    @property
+    def model(self):
+        for attr in self.__dict__["attributes"]:
+            if attr["type"] == "model":
+                return attr["value"]
+        return None
+
+    @property
+    def model_rarity(self):
+        for attr in self.__dict__["attributes"]:
+            if attr["type"] == "model":
+                return attr["rarity_per_mille"]
+        return None
+
+    @property
+    def symbol(self):
+        for attr in self.__dict__["attributes"]:
+            if attr["type"] == "symbol":
+                return attr["value"]
+        return None
+
+    @property
+    def backdrop(self):
+        for attr in self.__dict__["attributes"]:
+            if attr["type"] == "backdrop":
+                return attr["value"]
+        return None
+
+    @property
+    def backdrop_rarity(self):
+        for attr in self.__dict__["attributes"]:
+            if attr["type"] == "backdrop":
+                return attr["rarity_per_mille"]
+        return None
+
+def read_all(gifts: list):
+    for g in gifts:
+        g.name, g.price, g.floor_price, g.model, g.model_rarity, g.symbol, g.backdrop, g.backdrop_rarity
+
+def memory(cls, body: bytes) -> tuple:
+    # Bytes still allocated once the decoded page is dropped and only the gift objects remain.
+    gc.collect()
+    tracemalloc.start()
+    page = json.loads(body)["results"]
+    gifts = [cls(item) for item in page]
+    del page
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del gifts
+    return current, peak
+
+def best(fn) -> float:
+    number, _ = timeit.Timer(fn).autorange()
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+def main(n: int = 10_000):
+    body = json.dumps(search_page(n)).encode()
+    page = json.loads(body)["results"]
+    classes = {"legacy": LegacyPortalsGift, "current": PortalsGift}
+
+    assert all(PortalsGift(item).toDict() == item for item in page), "toDict() differs from the API dict"
+
+    print(f"{n} gifts, 8 fields read per gift")
+    print(f"{'class':>8} {'retained':>10} {'peak':>10} {'construct':>11} {'read all':>10} {'per field':>10}")
+    results = {}
+    for label, cls in classes.items():
+        retained, peak = memory(cls, body)
+        construct = best(lambda: [cls(item) for item in page])
+        gifts = [cls(item) for item in page]
+        read = best(lambda: read_all(gifts))
+        results[label] = retained, construct, read
+        print(f"{label:>8} {retained / 2**20:>8.2f}MB {peak / 2**20:>8.2f}MB {construct * 1e3:>9.2f}ms "
+              f"{read * 1e3:>8.2f}ms {read / (n * 8) * 1e9:>8.1f}ns")
+
+    from_list = best(lambda: PortalsGift.from_list(page))
+    print(f"PortalsGift.from_list: {from_list * 1e3:.2f}ms")
+
+    (old_retained, old_construct, old_read), (retained, construct, read) = results["legacy"], results["current"]
+    print(f"current vs legacy: retained {retained / old_retained - 1:+.0%}, construct {construct / old_construct:.2f}x, "
+          f"read {read / old_read:.2f}x; construct + read: {(construct + read) * 1e3:.2f}ms vs {(old_construct + old_read) * 1e3:.2f}ms")
+    assert retained < old_retained, "PortalsGift retains no less memory than the dict-backed class"
+    assert read < old_read, "PortalsGift field reads are no faster than the dict-backed class"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Local stand-in for the Portals API, serving fixture payloads so the library and the bot can be
+measured offline.
+
+    with FakePortals(latency=0.05, rate_limit_rate=0.01) as server, server.installed():
+        portalsmp.search(authData="tma fake")   # answered by the local server
+
+The market/actions/ stream grows by `actions_per_sec` actions per second (newest first, stable ids),
+so ActivityFeed polling sees realistic increments. Every request waits `latency` seconds (plus up to
+`jitter`), and fails with 500 at `error_rate` or 429 at `rate_limit_rate`.
+"""
+import json
+import time
+import random
+import socket
+import threading
+import contextlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from portalsmp import portalsapi
+from portalsmp.collections_ids import collections_ids
+from benchmarks.fixtures import make_nft, market_action, floors_body, filters_body
+
+def json_dumps(data) -> bytes:
+    return json.dumps(data).encode()
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 overflows at a few concurrent clients, and the dropped SYNs
+    # stall connects for a second: the benchmark would measure this queue instead of the client.
+    request_queue_size = 1024
+    daemon_threads = True
+
+class FakePortals:
+    """
+    Threaded HTTP server answering the Portals API routes used by portalsapi.
+
+    Args:
+        latency (float): Seconds added to every response. Defaults to 0.
+        jitter (float): Maximum extra random latency in seconds. Defaults to 0.
+        error_rate (float): Share of requests answered with 500. Defaults to 0.
+        rate_limit_rate (float): Share of requests answered with 429. Defaults to 0.
+        actions_per_sec (float): Growth rate of the market/actions/ stream. Defaults to 5.
+        seed (int): Fixture seed. Defaults to 0.
+        port (int): Port to listen on; 0 picks a free one. Defaults to 0.
+
+    Attributes:
+        url (str): Base URL to use as portalsapi.API_URL.
+        requests (int): Requests received.
+        errors (int): Requests answered with an injected 500.
+        rate_limited (int): Requests answered with an injected 429.
+    """
+    def __init__(self, latency: float = 0, jitter: float = 0, error_rate: float = 0, rate_limit_rate: float = 0,
+                 actions_per_sec: float = 5, seed: int = 0, port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.actions_per_sec = actions_per_sec
+        self.seed = seed
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._floors = json_dumps(floors_body(seed))
+        self._server = _Server(("127.0.0.1", port), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fake-portals", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    @contextlib.contextmanager
+    def installed(self):
+        """
+        Points portalsapi (and every client built on it) at this server for the duration of the block.
+        """
+        previous = portalsapi.API_URL
+        portalsapi.API_URL = self.url
+        try:
+            yield self
+        finally:
+            portalsapi.API_URL = previous
+
+    def _fault(self) -> int | None:
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.rate_limited += 1
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                return 500
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        return None
+
+    def _actions(self, offset: int, limit: int) -> list:
+        # Action i was created at started + i / actions_per_sec; the newest existing one comes first.
+        newest = int((time.time() - self.started) * self.actions_per_sec) + 1000
+        start = datetime.fromtimestamp(self.started, timezone.utc)
+        indexes = range(newest - offset, max(newest - offset - limit, -1), -1)
+        return [market_action(i, start + timedelta(seconds=(i - 1000) / self.actions_per_sec), self.seed) for i in indexes]
+
+    def _nfts(self, offset: int, limit: int) -> list:
+        rng = random.Random(f"{self.seed}:{offset}")
+        return [make_nft(rng) for _ in range(limit)]
+
+    def route(self, method: str, path: str, query: dict) -> tuple:
+        """
+        Returns (status, body bytes) for a request; body is b"" for 204.
+        """
+        def number(name, default):
+            try:
+                return int(query.get(name, [default])[0])
+            except ValueError:
+                return default
+
+        offset, limit = number("offset", 0), number("limit", 20)
+        if method == "GET":
+            if path == "nfts/search":
+                return 200, json_dumps({"results": self._nfts(offset, limit)})
+            if path == "market/actions/":
+                return 200, json_dumps({"actions": self._actions(offset, limit)})
+            if path == "users/actions/":
+                return 200, json_dumps({"actions": self._actions(offset, limit)})
+            if path == "collections/floors":
+                return 200, self._floors
+            if path == "collections/filters":
+                short_name = query.get("short_names", [""])[0]
+                return 200, json_dumps(filters_body(short_name, self.seed))
+            if path == "collections":
+                return 200, json_dumps({"collections": [{"id": cid, "name": name} for name, cid in collections_ids.items()][:limit]})
+            if path == "nfts/owned":
+                return 200, json_dumps({"nfts": self._nfts(offset, limit)})
+            if path == "users/wallets/":
+                return 200, json_dumps({"balance": "100.0", "frozen_funds": "0"})
+            if path == "points/my-points":
+                return 200, json_dumps({"points": 0})
+            if path == "offers/placed":
+                return 200, json_dumps({"offers": []})
+            if path == "offers/received":
+                return 200, json_dumps({"top_offers": []})
+            if path.startswith("collection-offers/"):
+                if path.endswith("/top"):
+                    return 200, json_dumps({"amount": "1.0"})
+                return 200, json_dumps([])
+        if method in ("POST", "PATCH"):
+            if path in ("nfts", "nfts/bulk-list", "offers", "collection-offers/", "collection-offers/cancel", "users/wallets/withdraw"):
+                return 204, b""
+            if path.startswith("offers/") or (path.startswith("nfts/") and path.endswith("/list")):
+                return 204, b""
+        return 404, json_dumps({"error": "not found"})
+
+def _handler(server: FakePortals):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body go out in separate writes; without this, Nagle + delayed ACK add ~40 ms.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _answer(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            fault = server._fault()
+            if fault is not None:
+                status, body = fault, json_dumps({"error": "rate limited" if fault == 429 else "internal error"})
+            else:
+                parts = urlsplit(self.path)
+                path = parts.path.removeprefix("/api/")
+                status, body = server.route(self.command, path, parse_qs(parts.query))
+            self.send_response(status)
+            if body:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _answer
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,73 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from portalsmp.collections_ids import collections_ids
+from portalsmp.portalsapi import toShortName
+
+MODELS = ["Cozy Galaxy", "Gummy Frog", "Ninja Mike", "Red Fire", "Emerald Plush", "Midnight Blue", "Bavaria", "Heartbeat"]
+BACKDROPS = ["Black", "Onyx Black", "Electric Purple", "Neon Blue", "Tomato", "Ivory White", "Gunship Green", "Lemongrass"]
+SYMBOLS = ["Illuminati", "Crown", "Anchor", "Rocket", "Skull", "Diamond", "Star", "Moon"]
+
+def make_nft(rng: random.Random, listed_at: datetime | None = None) -> dict:
+    """A listed gift shaped like the items of nfts/search and the "nft" of market actions."""
+    name = rng.choice(list(collections_ids))
+    floor = round(rng.uniform(2, 400), 2)
+    price = round(floor * rng.uniform(0.7, 1.8), 2)
+    gift_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    listed_at = listed_at or datetime.now(timezone.utc) - timedelta(seconds=rng.randint(0, 86400))
+    return {
+        "id": gift_id,
+        "tg_id": f"{name.replace(' ', '')}-{rng.randint(1, 150000)}",
+        "collection_id": collections_ids[name],
+        "external_collection_number": rng.randint(1, 150000),
+        "name": name,
+        "photo_url": f"https://nft.fragment.com/gift/{gift_id}.large.jpg",
+        "price": str(price),
+        "attributes": [
+            {"type": "model", "value": rng.choice(MODELS), "rarity_per_mille": rng.choice([3, 5, 8, 10, 15, 20])},
+            {"type": "symbol", "value": rng.choice(SYMBOLS), "rarity_per_mille": rng.choice([1, 2, 4, 5])},
+            {"type": "backdrop", "value": rng.choice(BACKDROPS), "rarity_per_mille": rng.choice([10, 12, 15, 20])},
+        ],
+        "listed_at": listed_at.isoformat().replace("+00:00", "Z"),
+        "status": "listed",
+        "animation_url": f"https://nft.fragment.com/gift/{gift_id}.lottie.json",
+        "emoji_id": str(rng.getrandbits(62)),
+        "floor_price": str(floor),
+        "unlocks_at": None,
+    }
+
+def search_page(n: int, seed: int = 0) -> dict:
+    """An nfts/search response body with n results."""
+    rng = random.Random(seed)
+    return {"results": [make_nft(rng) for _ in range(n)]}
+
+ACTION_TYPES = ["buy", "buy", "listing", "price_update", "offer"]
+
+def market_action(index: int, created_at: datetime, seed: int = 0) -> dict:
+    """The market/actions/ entry number `index` of a deterministic stream (same index, same action)."""
+    rng = random.Random(seed * 1_000_003 + index)
+    nft = make_nft(rng, listed_at=created_at)
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "type": rng.choice(ACTION_TYPES),
+        "amount": nft["price"],
+        "created_at": created_at.isoformat().replace("+00:00", "Z"),
+        "nft": nft,
+    }
+
+def actions_page(n: int, seed: int = 0) -> dict:
+    """A market/actions/ response body with n actions, newest first."""
+    now = datetime.now(timezone.utc)
+    return {"actions": [market_action(i, now - timedelta(seconds=i), seed) for i in range(n)]}
+
+def floors_body(seed: int = 0) -> dict:
+    """A collections/floors response body: short name -> floor price string."""
+    rng = random.Random(seed)
+    return {"floorPrices": {toShortName(name): str(round(rng.uniform(2, 400), 2)) for name in collections_ids}}
+
+def filters_body(short_name: str, seed: int = 0) -> dict:
+    """A collections/filters response body with model, backdrop and symbol floors of one collection."""
+    rng = random.Random(f"{seed}:{short_name}")
+    def table(values):
+        return {value: str(round(rng.uniform(2, 400), 2)) for value in values}
+    return {"floor_prices": {short_name: {"models": table(MODELS), "backdrops": table(BACKDROPS), "symbols": table(SYMBOLS)}}}
@@ -0,0 +1,205 @@
+"""
+Throughput and latency of the request layer and of a monitor cycle against a local FakePortals
+server (no network access needed).
+
+    python -m benchmarks.run
+    python -m benchmarks.run --latency 0.08 --jitter 0.04 --rate-limit-rate 0.02 --concurrency 16
+    python -m benchmarks.run --record traffic.jsonl.gz     # keep the fake server's answers
+    python -m benchmarks.run --replay traffic.jsonl.gz     # serve recorded answers, no server
+
+Reports operations/sec and p50/p99 latency for the blocking module functions (sequential and
+from a thread pool) and for AsyncPortalsClient. The monitor scenario then runs the bot itself:
+main.py's poll loop over a ShardedFeed feeding its Pipeline (dedupe -> enrich -> score -> notify,
+with a notifier that only counts messages), floor caches loaded from the same server. Its ops/s is
+batches per second of poll and stage work (pauses between polls excluded), p50/p99 are poll
+latencies, and the time each stage spends per batch is listed below it.
+"""
+import os
+import time
+import asyncio
+import logging
+import tempfile
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+import portalsmp as pm
+from portalsmp import replay
+from portalsmp.collections_ids import collections_ids
+from bot.shards import ShardedFeed, WatchShard
+from bot.scheduler import AdaptiveScheduler
+from benchmarks.fake_portals import FakePortals
+
+AUTH = "tma benchmark"
+CALLS = [
+    lambda: pm.search(limit=20, authData=AUTH),
+    lambda: pm.marketActivity(limit=20, authData=AUTH),
+    lambda: pm.giftsFloors(authData=AUTH),
+]
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def report(name: str, latencies: list, elapsed: float, failures: int):
+    print(f"{name:<28} {len(latencies) / elapsed:>9.1f} {percentile(latencies, 0.5) * 1e3:>9.1f} "
+          f"{percentile(latencies, 0.99) * 1e3:>9.1f} {failures:>8}")
+
+def timed(call) -> tuple:
+    started = time.perf_counter()
+    try:
+        call()
+        return time.perf_counter() - started, False
+    except pm.PortalsAPIError:
+        return time.perf_counter() - started, True
+
+def bench_sync(requests: int, threads: int):
+    started = time.perf_counter()
+    if threads == 1:
+        results = [timed(CALLS[i % len(CALLS)]) for i in range(requests)]
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(lambda i: timed(CALLS[i % len(CALLS)]), range(requests)))
+    elapsed = time.perf_counter() - started
+    report(f"sync, {threads} thread(s)", [r[0] for r in results], elapsed, sum(r[1] for r in results))
+
+async def bench_async(requests: int, concurrency: int):
+    async with pm.AsyncPortalsClient(AUTH, max_clients=concurrency) as client:
+        calls = [lambda: client.search(limit=20), lambda: client.marketActivity(limit=20), lambda: client.giftsFloors()]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    await calls[i % len(calls)]()
+                    return time.perf_counter() - started, False
+                except pm.PortalsAPIError:
+                    return time.perf_counter() - started, True
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    report(f"async, concurrency {concurrency}", [r[0] for r in results], elapsed, sum(r[1] for r in results))
+
+def _load_bot():
+    # main.py reads its settings at import; give it throwaway ones, nothing here talks to Telegram.
+    os.environ.setdefault("API_ID", "0")
+    os.environ.setdefault("API_HASH", "benchmark")
+    os.environ.setdefault("CHANNEL", "@benchmark")
+    os.environ.setdefault("SEEN_DB", os.path.join(tempfile.mkdtemp(), "seen.sqlite3"))
+    os.environ["HISTORY_DIR"] = ""
+    import main as bot
+    logging.getLogger().setLevel(logging.WARNING)
+    return bot
+
+class _Me:
+    id = 0
+    username = "benchmark"
+
+class _App:
+    async def get_me(self):
+        return _Me()
+
+class _Notifier:
+    # Counts what the notify stage would send to the channel.
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, chat_id, text, **kwargs):
+        self.sent += 1
+
+async def bench_cycle(cycles: int, interval: float, shards: int):
+    bot = _load_bot()
+    watch = [WatchShard("all", {})] + [WatchShard(name, {"gift_name": name}) for name in list(collections_ids)[:shards - 1]]
+    async with pm.AsyncPortalsClient(AUTH) as client, \
+            pm.FloorCache(client) as floors, \
+            pm.AttributeFloorIndex(client, gift_names=list(collections_ids)[:20]) as attr_floors:
+        feed = ShardedFeed(client, watch)
+        scheduler = AdaptiveScheduler(min_interval=interval, max_interval=interval, budget_per_minute=10**6, jitter=0)
+        notifier = _Notifier()
+        await feed.poll()
+
+        polls, failures = [], 0
+        poll = feed.poll
+
+        async def timed_poll():
+            nonlocal failures
+            started = time.perf_counter()
+            try:
+                batch = await poll()
+            except pm.PortalsAPIError:
+                failures += 1
+                raise
+            finally:
+                polls.append(time.perf_counter() - started)
+            failures += bool(feed.errors)
+            return batch
+        feed.poll = timed_poll
+
+        async def source():
+            # the bot's own poll loop, cut off after `cycles` batches
+            stream = bot.poll_forever(_App(), client, feed, floors, scheduler)
+            try:
+                count = 0
+                async for batch in stream:
+                    yield batch
+                    count += 1
+                    if count == cycles:
+                        break
+            finally:
+                await stream.aclose()
+
+        pipeline = bot.build_pipeline(source(), notifier, floors, bot.ALERT_RULE.scorer(attr_floors))
+        await pipeline.run()
+
+    stages = {stage.name: stage for stage in pipeline.stages}
+    busy = sum(polls) + sum(stage.busy for stage in pipeline.stages)
+    print(f"{'monitor pipeline, ' + str(shards) + ' shard(s)':<28} {pipeline.fetched / busy if busy else 0:>9.1f} "
+          f"{percentile(polls, 0.5) * 1e3:>9.1f} {percentile(polls, 0.99) * 1e3:>9.1f} {failures + sum(stage.errors for stage in pipeline.stages):>8}"
+          f"   ({bot.FETCHED.value()} actions, {feed.requests} requests, {notifier.sent} alerts)")
+    print("    per batch: " + " | ".join(f"{name} {stage.busy / max(stage.processed, 1) * 1e3:.2f} ms" for name, stage in stages.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="server latency per request, seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra random latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500 answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429 answers")
+    parser.add_argument("--actions-per-sec", type=float, default=20, help="market activity growth rate")
+    parser.add_argument("--requests", type=int, default=300, help="requests per request-layer scenario")
+    parser.add_argument("--threads", type=int, default=8, help="threads for the pooled sync scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent requests for the async scenario")
+    parser.add_argument("--cycles", type=int, default=20, help="monitor cycles (batches through the bot's pipeline)")
+    parser.add_argument("--cycle-interval", type=float, default=0.5, help="pause between monitor cycles, seconds")
+    parser.add_argument("--shards", type=int, default=4, help="watch shards in the monitor cycle")
+    parser.add_argument("--record", help="record the traffic to this archive")
+    parser.add_argument("--replay", help="answer from this archive instead of a fake server")
+    parser.add_argument("--replay-speed", type=float, default=None, help="replay recorded latencies this many times faster")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if args.replay:
+            tape = stack.enter_context(replay.replaying(args.replay, args.replay_speed))
+            print(f"replaying {args.replay} (speed {args.replay_speed or 'unlimited'})")
+        else:
+            server = stack.enter_context(FakePortals(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                                     rate_limit_rate=args.rate_limit_rate, actions_per_sec=args.actions_per_sec))
+            stack.enter_context(server.installed())
+            if args.record:
+                stack.enter_context(replay.recording(args.record))
+            print(f"fake server {server.url}: latency {args.latency * 1e3:.0f}+{args.jitter * 1e3:.0f} ms, "
+                  f"errors {args.error_rate:.1%}, 429s {args.rate_limit_rate:.1%}")
+        print(f"{'scenario':<28} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'failed':>8}")
+        bench_sync(args.requests // 3, 1)
+        bench_sync(args.requests, args.threads)
+        asyncio.run(bench_async(args.requests, args.concurrency))
+        asyncio.run(bench_cycle(args.cycles, args.cycle_interval, args.shards))
+        if args.replay:
+            print(f"replay: {tape.hits} answered, {tape.misses} not recorded")
+        else:
+            print(f"server: {server.requests} requests, {server.errors} injected 500s, {server.rate_limited} injected 429s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Replays recorded market activity through the alert rules and reports what each parameter set would
+have alerted, and how those deals compared with the sales that followed.
+
+    python -m bot.backtest traffic.jsonl.gz --min-score 5,10,15,20 --model-weight 1,1.5,2 --max-median-ratio 0,1.2
+
+The input is an archive written with PORTALS_RECORD (portalsmp.replay): marketActivity pages are
+the action stream, giftsFloors and filterFloors answers are the floor snapshots in effect from the
+moment they were recorded. Every action is scored once, in recording order, with the snapshot of
+that moment, the sale statistics of the stream so far and the same find_deals() the bot uses. An alert is then compared with the "buy"
+actions of the same collection and model within --horizon after it: upside is the median of those
+sale prices over the alerted price, minus one.
+
+Parameter sets are the product of the given grids and are spread over --workers processes; each
+worker decodes the archive once and evaluates its share of the sets against the in-memory stream.
+"""
+import os
+import copy
+import argparse
+import itertools
+import statistics
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+from portalsmp.portalsapi import json_loads
+from portalsmp.activity_feed import action_key, action_time
+from portalsmp.floors import FloorCache, AttributeFloorIndex
+from portalsmp.frame import GiftFrame
+from portalsmp.replay import read_archive
+from bot.rules import AlertRule, find_deals
+from bot.stats import SaleStats
+
+class Event(NamedTuple):
+    """
+    New actions of one recorded marketActivity page, with the floors known at that time.
+    """
+    t: float
+    frame: GiftFrame
+    attr_floors: AttributeFloorIndex
+
+class Result(NamedTuple):
+    rule: AlertRule
+    alerts: int
+    compared: int
+    hit_rate: float | None
+    median_upside: float | None
+
+def load_stream(path: str) -> tuple:
+    """
+    Decodes an archive into (events, sales), where sales maps (collection, model) to the sorted
+    lists (times, prices) of its "buy" actions.
+    """
+    floors = FloorCache(None)
+    attr_floors = AttributeFloorIndex(None)
+    snapshot = copy.copy(attr_floors)
+    seen = set()
+    events = []
+    sales = defaultdict(list)
+
+    for record in read_archive(path):
+        if record.get("status") != 200:
+            continue
+        name = record.get("name")
+        if name not in ("marketActivity", "giftsFloors", "filterFloors"):
+            continue
+        data = json_loads(record["body"])
+        if name == "giftsFloors":
+            floors.load(data.get("floorPrices"))
+            continue
+        if name == "filterFloors":
+            for short_name, result in (data.get("floor_prices") or {}).items():
+                attr_floors.load(short_name, result)
+            snapshot = copy.copy(attr_floors)
+            continue
+
+        new = []
+        for action in data.get("actions") or []:
+            key = action_key(action)
+            if key in seen:
+                continue
+            seen.add(key)
+            new.append(action)
+            nft = action.get("nft") or {}
+            created = action_time(action)
+            if action.get("type") == "buy" and created is not None and action.get("amount"):
+                model = next((a.get("value") for a in nft.get("attributes") or () if a.get("type") == "model"), None)
+                sales[(nft.get("name"), model)].append((created, float(action["amount"])))
+        if new:
+            events.append(Event(record["t"], GiftFrame(new, floors=floors), snapshot))
+
+    for key, points in sales.items():
+        points.sort()
+        sales[key] = ([t for t, _ in points], [price for _, price in points])
+    return events, dict(sales)
+
+def evaluate(rule: AlertRule, events: list, sales: dict, horizon: float) -> Result:
+    """
+    Runs one rule over the stream.
+    """
+    alerts = 0
+    upsides = []
+    scorers = {}
+    sale_stats = SaleStats(window=rule.sales_window)
+    for event in events:
+        scorer = scorers.get(id(event.attr_floors))
+        if scorer is None:
+            scorer = scorers[id(event.attr_floors)] = rule.scorer(event.attr_floors)
+        # as in the bot: a polled batch feeds the sale statistics before it is scored
+        sale_stats.update(event.frame.source)
+        for deal in find_deals(event.frame, scorer, rule.min_score, sale_stats, rule.max_median_ratio):
+            alerts += 1
+            times, prices = sales.get((deal["name"], deal["model"]), ((), ()))
+            later = prices[bisect_right(times, event.t):bisect_left(times, event.t + horizon)]
+            if later and deal["price"]:
+                upsides.append(statistics.median(later) / deal["price"] - 1)
+    return Result(
+        rule,
+        alerts,
+        len(upsides),
+        sum(upside > 0 for upside in upsides) / len(upsides) if upsides else None,
+        statistics.median(upsides) if upsides else None,
+    )
+
+_stream = None
+
+def _init_worker(path: str):
+    global _stream
+    _stream = load_stream(path)
+
+def _evaluate_in_worker(args: tuple) -> Result:
+    rule, horizon = args
+    return evaluate(rule, *_stream, horizon)
+
+def sweep(path: str, rules: list, horizon: float = 7 * 86400, workers: int | None = None) -> list:
+    """
+    Evaluates every rule over the archive, in parallel when `workers` > 1, and returns Results in rule order.
+    """
+    if workers == 1 or len(rules) == 1:
+        events, sales = load_stream(path)
+        return [evaluate(rule, events, sales, horizon) for rule in rules]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(path,)) as pool:
+        chunksize = max(1, len(rules) // (workers * 4))
+        return list(pool.map(_evaluate_in_worker, [(rule, horizon) for rule in rules], chunksize=chunksize))
+
+def _grid(text: str) -> list:
+    return [float(value) for value in text.split(",") if value.strip()]
+
+def _duration(text: str) -> float:
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    return float(text[:-1]) * units[text[-1]] if text[-1] in units else float(text)
+
+def main():
+    defaults = AlertRule()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive", help="traffic archive recorded with PORTALS_RECORD")
+    parser.add_argument("--min-score", default=str(defaults.min_score), help="comma-separated grid")
+    parser.add_argument("--collection-weight", default=str(defaults.collection_weight), help="comma-separated grid")
+    parser.add_argument("--model-weight", default=str(defaults.model_weight), help="comma-separated grid")
+    parser.add_argument("--backdrop-weight", default=str(defaults.backdrop_weight), help="comma-separated grid")
+    parser.add_argument("--rarity-bonus", default=str(defaults.rarity_bonus), help="comma-separated grid")
+    parser.add_argument("--max-median-ratio", default=str(defaults.max_median_ratio), help="comma-separated grid, 0 = off")
+    parser.add_argument("--sales-window", default=f"{defaults.sales_window:g}s", help="sales the median is taken over, e.g. 6h or 1d")
+    parser.add_argument("--horizon", default="7d", help="how long after an alert sales count, e.g. 12h or 7d")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    args = parser.parse_args()
+
+    grids = [_grid(args.min_score), _grid(args.collection_weight), _grid(args.model_weight), _grid(args.backdrop_weight), _grid(args.rarity_bonus), _grid(args.max_median_ratio)]
+    rules = [AlertRule(*values, sales_window=_duration(args.sales_window)) for values in itertools.product(*grids)]
+    results = sweep(args.archive, rules, _duration(args.horizon), args.workers)
+
+    print(f"{'min_score':>9} {'w_coll':>6} {'w_model':>7} {'w_bg':>5} {'rarity':>6} {'median':>6} {'alerts':>7} {'compared':>8} {'hit rate':>8} {'upside':>7}")
+    for result in results:
+        rule = result.rule
+        hit_rate = f"{result.hit_rate:.0%}" if result.hit_rate is not None else "-"
+        upside = f"{result.median_upside:+.1%}" if result.median_upside is not None else "-"
+        print(f"{rule.min_score:>9g} {rule.collection_weight:>6g} {rule.model_weight:>7g} {rule.backdrop_weight:>5g} "
+              f"{rule.rarity_bonus:>6g} {rule.max_median_ratio:>6g} {result.alerts:>7} {result.compared:>8} {hit_rate:>8} {upside:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import time
+import random
+import asyncio
+import logging
+from playwright.async_api import async_playwright
+
+class CloudflareBrowser:
+    """
+    Long-lived headless Chromium that obtains Cloudflare clearance for the Portals API client.
+
+    The browser is started once, on the first solve. solve() drives the page like a user would and
+    collects the site cookies (cf_clearance, __cf_bm, ...); apply() copies them into an
+    AsyncPortalsClient, so the API requests present the clearance the browser earned. refresh() is
+    meant as the client's challenge_solver, so the browser runs only when the API actually answers
+    with a challenge; challenges that arrive while a solve is running (from any client) reuse its
+    clearance as long as it is valid, instead of driving the browser again.
+
+    Cloudflare binds cf_clearance to the user-agent it was earned with, so by default the browser
+    context uses the client's own User-Agent header (a Chrome one, matching the client's Chrome
+    impersonation) and the client's headers are never changed.
+
+    Args:
+        url (str): Page to open. Defaults to the Portals market.
+        user_agent (str | None): User-agent of the browser context. Defaults to None (the client's User-Agent).
+        headless (bool): Run Chromium headless. Defaults to True.
+        lifetime (float): Seconds a solve is trusted when the site sets no expiring clearance cookie. Defaults to 1800.
+        timeout (float): Seconds to wait for the cf_clearance cookie. Defaults to 30.
+
+    Attributes:
+        cookies (list): Cookies from the last solve (Playwright cookie dicts).
+        expires (float): UNIX time until which the clearance is considered valid.
+        solved_at (float): UNIX time the last solve finished.
+        solves (int): Number of times the browser was driven.
+    """
+    def __init__(self, url: str = "https://portals-market.com", user_agent: str | None = None, headless: bool = True, lifetime: float = 1800, timeout: float = 30):
+        self.url = url
+        self.user_agent = user_agent
+        self.headless = headless
+        self.lifetime = lifetime
+        self.timeout = timeout
+        self.cookies = []
+        self.expires = 0.0
+        self.solved_at = 0.0
+        self.solves = 0
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._context_user_agent = None
+        self._page = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self, user_agent: str | None = None):
+        """
+        Starts the browser, and a context with `user_agent` unless the current one already uses it.
+        """
+        if self._browser is None:
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            logging.info("[CF] Browser started")
+        if self._context is not None and self._context_user_agent == user_agent:
+            return
+        if self._context is not None:
+            await self._context.close()
+        self._context = await self._browser.new_context(user_agent=user_agent)
+        self._context_user_agent = user_agent
+        self._page = await self._context.new_page()
+
+    async def stop(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = self._browser = self._context = self._context_user_agent = self._page = None
+
+    async def solve(self, user_agent: str | None = None):
+        """
+        Opens the site in the persistent context and waits for the clearance cookies.
+        """
+        async with self._lock:
+            await self._solve(user_agent or self.user_agent)
+
+    async def _solve(self, user_agent: str | None):
+        try:
+            await self._drive(user_agent)
+        except Exception:
+            # A crashed page or browser is replaced on the next solve.
+            await self.stop()
+            raise
+
+    async def refresh(self, client):
+        """
+        Drives the browser and copies the fresh clearance into client. When another solve for the same
+        user-agent finished after this call began and its clearance has not expired, that clearance is
+        copied instead.
+
+        Suitable as AsyncPortalsClient(challenge_solver=...), so the browser only runs when a request
+        actually got a Cloudflare challenge.
+        """
+        requested = time.time()
+        user_agent = self.user_agent or client.headers.get("User-Agent")
+        async with self._lock:
+            fresh = self.solved_at >= requested and time.time() < self.expires and self._context_user_agent == user_agent
+            if not fresh:
+                await self._solve(user_agent)
+        self.apply(client)
+
+    def apply(self, client):
+        """
+        Copies the clearance cookies into client.
+        """
+        for cookie in self.cookies:
+            client.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie.get("path", "/"))
+
+    async def _drive(self, user_agent: str | None):
+        await self.start(user_agent)
+        page = self._page
+        await page.goto(self.url, wait_until="domcontentloaded")
+        await asyncio.sleep(random.uniform(2, 5))
+        for _ in range(random.randint(2, 5)):
+            await page.mouse.wheel(0, random.randint(300, 700))
+            await asyncio.sleep(random.uniform(0.3, 1.0))
+
+        deadline = time.time() + self.timeout
+        cookies = await self._context.cookies(self.url)
+        while not any(c["name"] == "cf_clearance" for c in cookies) and time.time() < deadline:
+            await asyncio.sleep(1)
+            cookies = await self._context.cookies(self.url)
+
+        clearance = [c["expires"] for c in cookies if c["name"] == "cf_clearance" and c.get("expires", -1) > 0]
+        self.cookies = cookies
+        self.expires = min(clearance) if clearance else time.time() + self.lifetime
+        self.solved_at = time.time()
+        self.solves += 1
+        logging.info(f"[CF] Clearance obtained, {len(cookies)} cookies, valid for {self.expires - time.time():.0f}s")
@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import NamedTuple
+from portalsmp.portalsapi import json_loads
+from portalsmp.activity_feed import action_key, action_time
+
+class HistoryRecord(NamedTuple):
+    """
+    One stored market action ("action") or search result ("listing").
+
+    Attributes:
+        kind (str): "action" or "listing".
+        t (float): UNIX time of the action, or of the search snapshot for listings.
+        collection (str | None): Collection name.
+        model (str | None): Model name.
+        backdrop (str | None): Backdrop name.
+        type (str | None): Action type ("buy", "listing", ...); None for listings.
+        price (float | None): Action amount or listing price in TON.
+        data (dict): The action or gift as returned by the API.
+    """
+    kind: str
+    t: float
+    collection: str | None
+    model: str | None
+    backdrop: str | None
+    type: str | None
+    price: float | None
+    data: dict
+
+def _traits(nft: dict) -> tuple:
+    model = backdrop = None
+    for attr in nft.get("attributes") or ():
+        if attr.get("type") == "model":
+            model = attr.get("value")
+        elif attr.get("type") == "backdrop":
+            backdrop = attr.get("value")
+    return model, backdrop
+
+def _price(value) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class HistoryStore:
+    """
+    Append-only, compressed store of everything the bot fetched, for questions about the past
+    ("all Plush Pepe sales of the last 7 days") without downloading it again.
+
+    Added records are buffered; flush() groups them by kind and collection, and writes each group as
+    one zlib-compressed block of JSON lines to the end of the current segment file (segments/000001.seg,
+    rotated at `segment_size`). The SQLite block index stores, for every block, its collection, time
+    range, position and the model/backdrop pairs it contains, so scan() reads and decompresses only
+    the blocks that can match and yields their records one by one. Memory use of a scan is one block,
+    whatever the size of the history.
+
+    Segments are never rewritten. A crash between writing a block and indexing it leaves unreferenced
+    bytes at the end of a segment, which are skipped.
+
+    Actions are stored once: the keys (action_key) of the newest `remember` stored actions are loaded
+    on open, and add_actions() skips actions already stored, e.g. the ones a restarted bot fetches again.
+
+    Args:
+        path (str): Directory of the store (created if missing).
+        segment_size (int): Bytes after which a new segment file is started. Defaults to 64 MiB.
+        max_pending (int): Buffered records that trigger a flush on add. Defaults to 5000.
+        level (int): zlib compression level. Defaults to 6.
+        remember (int): Keys of recent actions kept to skip duplicates. Defaults to 100000.
+
+    Attributes:
+        records (int): Records written since the store was opened.
+        blocks (int): Blocks written since the store was opened.
+    """
+    def __init__(self, path: str, segment_size: int = 64 * 2**20, max_pending: int = 5000, level: int = 6, remember: int = 100_000):
+        self.path = path
+        self.segment_size = segment_size
+        self.max_pending = max_pending
+        self.level = level
+        self.remember = remember
+        self.records = 0
+        self.blocks = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(path, "segments"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS blocks (id INTEGER PRIMARY KEY, kind TEXT NOT NULL, collection TEXT, "
+            "t_min REAL NOT NULL, t_max REAL NOT NULL, segment INTEGER NOT NULL, offset INTEGER NOT NULL, "
+            "length INTEGER NOT NULL, count INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS blocks_collection_idx ON blocks (collection, kind, t_max)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS blocks_time_idx ON blocks (kind, t_max)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS block_traits (block_id INTEGER NOT NULL, model TEXT, backdrop TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS block_traits_idx ON block_traits (block_id, model, backdrop)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS block_traits_model_idx ON block_traits (model)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS block_traits_backdrop_idx ON block_traits (backdrop)")
+        self._db.commit()
+        self._segment = self._db.execute("SELECT COALESCE(MAX(segment), 1) FROM blocks").fetchone()[0]
+        self._file = open(self._segment_path(self._segment), "ab")
+        self._keys = OrderedDict.fromkeys(self.recent_keys(remember)[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(count), 0) FROM blocks").fetchone()[0] + len(self._pending)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, "segments", f"{segment:06d}.seg")
+
+    def _buffer(self, kind: str, t: float, data: dict, type_: str | None, price):
+        # Serialized right away: the bot annotates the same dicts (shard, floor, score, ...) in later
+        # pipeline stages, and only what the API returned belongs in the history.
+        nft = (data.get("nft") or {}) if kind == "action" else data
+        model, backdrop = _traits(nft)
+        line = json.dumps([t, model, backdrop, type_, _price(price), data])
+        self._pending.append((kind, t, nft.get("name"), model, backdrop, line))
+
+    def add_actions(self, actions: list):
+        """
+        Buffers marketActivity actions as they are at the time of the call. Actions without a parsable
+        created_at are stamped with the current time.
+        """
+        now = time.time()
+        for action in actions:
+            key = action_key(action)
+            if key in self._keys:
+                continue
+            self._keys[key] = None
+            self._buffer("action", action_time(action) or now, action, action.get("type"), action.get("amount"))
+        while len(self._keys) > self.remember:
+            self._keys.popitem(last=False)
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+
+    def add_listings(self, gifts: list, t: float | None = None):
+        """
+        Buffers a search() snapshot: PortalsGift objects or raw result dicts, all stamped with `t` (default: now).
+        """
+        t = t or time.time()
+        for gift in gifts:
+            data = gift.toDict() if hasattr(gift, "toDict") else gift
+            self._buffer("listing", t, data, None, data.get("price"))
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered records as one block per (kind, collection) and indexes the blocks.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            groups = defaultdict(list)
+            for record in pending:
+                groups[record[0], record[2]].append(record)
+
+            for (kind, collection), records in groups.items():
+                records.sort(key=lambda record: record[1])
+                blob = zlib.compress("\n".join(record[5] for record in records).encode(), self.level)
+                if self._file.tell() and self._file.tell() + len(blob) > self.segment_size:
+                    self._file.close()
+                    self._segment += 1
+                    self._file = open(self._segment_path(self._segment), "ab")
+                offset = self._file.tell()
+                self._file.write(blob)
+                self._file.flush()
+
+                cursor = self._db.execute(
+                    "INSERT INTO blocks (kind, collection, t_min, t_max, segment, offset, length, count) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (kind, collection, records[0][1], records[-1][1], self._segment, offset, len(blob), len(records)),
+                )
+                traits = {(record[3], record[4]) for record in records}
+                self._db.executemany("INSERT INTO block_traits (block_id, model, backdrop) VALUES (?, ?, ?)",
+                                     [(cursor.lastrowid, model, backdrop) for model, backdrop in traits])
+                self.records += len(records)
+                self.blocks += 1
+            self._db.commit()
+
+    def recent_keys(self, limit: int = 4096) -> tuple:
+        """
+        Returns (keys, newest): the action_key of at least the `limit` newest stored actions (fewer if
+        the history is shorter), oldest first, and the creation time of the newest one (None when empty).
+        Used to resume an ActivityFeed where the previous run stopped.
+        """
+        keys = []
+        newest = None
+        blocks = self._db.execute("SELECT segment, offset, length FROM blocks WHERE kind = 'action' ORDER BY id DESC")
+        for segment, offset, length in blocks:
+            if len(keys) >= limit:
+                break
+            with open(self._segment_path(segment), "rb") as file:
+                file.seek(offset)
+                records = [json_loads(line) for line in zlib.decompress(file.read(length)).splitlines()]
+            keys.extend(action_key(record[5]) for record in reversed(records))
+            newest = max(newest or 0, records[-1][0])
+        keys.reverse()
+        return keys, newest
+
+    def scan(self, collection: str | None = None, model: str | None = None, backdrop: str | None = None,
+             since: float | None = None, until: float | None = None, kind: str = "action", types: tuple | None = None):
+        """
+        Yields stored records matching every given filter, block by block in write order.
+
+        Only flushed records are visited; call flush() first to include the buffered ones.
+
+        Args:
+            collection (str | None): Collection name (e.g. "Plush Pepe").
+            model (str | None): Model name.
+            backdrop (str | None): Backdrop name.
+            since (float | None): Earliest UNIX time, inclusive.
+            until (float | None): Latest UNIX time, exclusive.
+            kind (str): "action" or "listing". Defaults to "action".
+            types (tuple | None): Action types to keep, e.g. ("buy",). Defaults to None (all).
+
+        Returns:
+            Iterator of HistoryRecord.
+
+        Example:
+            sales = store.scan("Plush Pepe", since=time.time() - 7 * 86400, types=("buy",))
+        """
+        query = "SELECT id, collection, segment, offset, length FROM blocks b WHERE kind = ?"
+        params = [kind]
+        if collection is not None:
+            query += " AND collection = ?"
+            params.append(collection)
+        if since is not None:
+            query += " AND t_max >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND t_min < ?"
+            params.append(until)
+        if model is not None or backdrop is not None:
+            query += " AND EXISTS (SELECT 1 FROM block_traits k WHERE k.block_id = b.id"
+            if model is not None:
+                query += " AND k.model = ?"
+                params.append(model)
+            if backdrop is not None:
+                query += " AND k.backdrop = ?"
+                params.append(backdrop)
+            query += ")"
+        query += " ORDER BY id"
+        blocks = self._db.execute(query, params).fetchall()
+
+        files = {}
+        try:
+            for _, block_collection, segment, offset, length in blocks:
+                file = files.get(segment)
+                if file is None:
+                    file = files[segment] = open(self._segment_path(segment), "rb")
+                file.seek(offset)
+                for line in zlib.decompress(file.read(length)).splitlines():
+                    t, rec_model, rec_backdrop, type_, price, data = json_loads(line)
+                    if since is not None and t < since or until is not None and t >= until:
+                        continue
+                    if model is not None and rec_model != model or backdrop is not None and rec_backdrop != backdrop:
+                        continue
+                    if types is not None and type_ not in types:
+                        continue
+                    yield HistoryRecord(kind, t, block_collection, rec_model, rec_backdrop, type_, price, data)
+        finally:
+            for file in files.values():
+                file.close()
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"[HISTORY] Final flush failed: {e}")
+        self._file.close()
+        self._db.close()
@@ -0,0 +1,159 @@
+import time
+import asyncio
+import logging
+from pyrogram.errors import FloodWait
+from portalsmp.metrics import REGISTRY
+
+SENT = REGISTRY.counter("bot_messages_sent_total", "Telegram messages delivered.")
+SEND_FAILURES = REGISTRY.counter("bot_send_failures_total", "Telegram messages dropped after errors or FloodWaits.")
+DROPPED = REGISTRY.counter("bot_messages_dropped_total", "Telegram messages dropped because the queue was full.")
+FLOOD_WAITS = REGISTRY.counter("bot_flood_waits_total", "FloodWait errors handled.")
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: `rate` tokens per second, at most `capacity` stored.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self) -> float:
+        """
+        Takes a token if one is available and returns 0, otherwise returns the seconds until one is.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while (delay := self.delay()) > 0:
+            await asyncio.sleep(delay)
+
+class Notifier:
+    """
+    Background Telegram sender with per-chat rate limiting and FloodWait handling.
+
+    send() only enqueues and returns immediately, so the fetch loop is never blocked by Telegram.
+    A worker task delivers messages in order, each chat limited by a token bucket (by default
+    20 messages per minute with bursts of 3, matching Telegram's limits for groups and channels).
+    On FloodWait the worker sleeps for the requested time and retries the same message, at most
+    `flood_retries` times; a message whose FloodWait exceeds `max_flood_wait` seconds, or that keeps
+    getting them, is dropped, so one chat cannot stall the queue. Other errors are retried up to
+    `retries` times before the message is dropped.
+
+    Args:
+        app (pyrogram.Client): Started Pyrogram client.
+        rate (float): Messages per second per chat. Defaults to 20/60.
+        burst (int): Messages per chat that may be sent back to back. Defaults to 3.
+        maxsize (int): Queue size; when full, the oldest pending message is dropped. Defaults to 1000.
+        retries (int): Attempts for errors other than FloodWait. Defaults to 3.
+        flood_retries (int): FloodWaits waited out per message before it is dropped. Defaults to 3.
+        max_flood_wait (float): Longest FloodWait in seconds that is waited out. Defaults to 120.
+
+    Attributes:
+        sent (int): Messages delivered.
+        failed (int): Messages dropped after errors or FloodWaits.
+        dropped (int): Messages dropped because the queue was full.
+        flood_waits (int): FloodWait errors handled.
+    """
+    def __init__(self, app, rate: float = 20 / 60, burst: int = 3, maxsize: int = 1000, retries: int = 3,
+                 flood_retries: int = 3, max_flood_wait: float = 120):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.flood_retries = flood_retries
+        self.max_flood_wait = max_flood_wait
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.flood_waits = 0
+        self._buckets = {}
+        self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, drain: float = 5):
+        """
+        Waits up to `drain` seconds for queued messages to be delivered, then stops the worker.
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), drain)
+        except asyncio.TimeoutError:
+            logging.warning(f"[NOTIFY] Stopping with {self.queue.qsize()} undelivered messages")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def send(self, chat_id, text: str, **kwargs):
+        """
+        Enqueues app.send_message(chat_id, text, **kwargs) without waiting for delivery.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+            DROPPED.inc()
+        self.queue.put_nowait((chat_id, text, kwargs))
+
+    async def _run(self):
+        while True:
+            chat_id, text, kwargs = await self.queue.get()
+            try:
+                await self._deliver(chat_id, text, kwargs)
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, chat_id, text: str, kwargs: dict):
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._buckets[chat_id] = TokenBucket(self.rate, self.burst)
+
+        attempt = floods = 0
+        while True:
+            await bucket.acquire()
+            try:
+                await self.app.send_message(chat_id, text, **kwargs)
+                self.sent += 1
+                SENT.inc()
+                return
+            except FloodWait as e:
+                self.flood_waits += 1
+                FLOOD_WAITS.inc()
+                floods += 1
+                if floods > self.flood_retries or e.value > self.max_flood_wait:
+                    self.failed += 1
+                    SEND_FAILURES.inc()
+                    logging.error(f"[SEND ERROR] Dropped message to {chat_id} after FloodWait {e.value}s ({floods} in a row)")
+                    return
+                logging.warning(f"[NOTIFY] FloodWait {e.value}s for {chat_id}")
+                await asyncio.sleep(e.value)
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.retries:
+                    self.failed += 1
+                    SEND_FAILURES.inc()
+                    logging.error(f"[SEND ERROR] {e}")
+                    return
+                await asyncio.sleep(2 ** attempt)
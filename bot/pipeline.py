@@ -0,0 +1,147 @@
+import time
+import asyncio
+import inspect
+import logging
+
+class Stage:
+    """
+    One step of a Pipeline: `workers` tasks take items from a bounded queue, pass each through
+    `handler` and hand the result to the next stage.
+
+    The handler may be a function or a coroutine function; returning None drops the item. A handler
+    error is logged and drops the item without stopping the stage. When the next stage's queue is
+    full the workers wait, so a slow stage throttles the ones before it instead of piling up memory.
+
+    Args:
+        name (str): Stage name, used in logs and stats.
+        handler (Callable): Item -> item | None.
+        workers (int): Number of concurrent workers; more than 1 may reorder items. Defaults to 1.
+        maxsize (int): Size of the input queue. Defaults to 100.
+
+    Attributes:
+        queue (asyncio.Queue): Input queue.
+        processed (int): Items handled.
+        passed (int): Items handed to the next stage.
+        errors (int): Handler errors.
+        busy (float): Seconds spent inside the handler.
+    """
+    def __init__(self, name: str, handler, workers: int = 1, maxsize: int = 100):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.processed = 0
+        self.passed = 0
+        self.errors = 0
+        self.busy = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def handle(self, item):
+        start = time.perf_counter()
+        try:
+            result = self.handler(item)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"[STAGE {self.name}] {e}")
+            result = None
+        self.busy += time.perf_counter() - start
+        self.processed += 1
+        return result
+
+class Pipeline:
+    """
+    Runs an async source and a chain of Stages concurrently, connected by bounded queues.
+
+    The source (an async iterable, e.g. a polling loop) keeps fetching while later stages enrich and
+    deliver earlier items; it only waits when the first queue is full. stats() reports, per stage,
+    queue depth, throughput and utilization since the previous call, which shows where the
+    bottleneck is: a stage with a full queue and utilization near 1 is the one holding the rest back.
+
+    Args:
+        source (AsyncIterable): Items fed to the first stage.
+        stages (list): Stage list, in processing order.
+
+    Attributes:
+        fetched (int): Items taken from the source.
+
+    Example:
+        pipeline = Pipeline(poll_forever(), [Stage("dedupe", is_new), Stage("notify", send)])
+        await pipeline.run()
+    """
+    def __init__(self, source, stages: list):
+        self.source = source
+        self.stages = stages
+        self.fetched = 0
+        self._last = time.monotonic()
+        self._counts = {stage.name: (0, 0.0) for stage in stages}
+
+    async def run(self):
+        """
+        Runs until the source is exhausted and every queue is drained (or until cancelled).
+        """
+        tasks = [
+            asyncio.create_task(self._work(stage, self.stages[i + 1] if i + 1 < len(self.stages) else None))
+            for i, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+        try:
+            first = self.stages[0].queue
+            async for item in self.source:
+                self.fetched += 1
+                await first.put(item)
+            for stage in self.stages:
+                await stage.queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _work(self, stage: Stage, next_stage: Stage | None):
+        while True:
+            item = await stage.queue.get()
+            try:
+                result = await stage.handle(item)
+                if result is not None:
+                    stage.passed += 1
+                    if next_stage is not None:
+                        await next_stage.queue.put(result)
+            finally:
+                stage.queue.task_done()
+
+    def stats(self) -> dict:
+        """
+        Returns {stage name: {"depth", "maxsize", "processed", "passed", "errors", "rate", "utilization"}},
+        where rate (items/s) and utilization (busy share of the workers' time) cover the period since
+        the previous call.
+        """
+        now = time.monotonic()
+        elapsed = max(now - self._last, 1e-9)
+        self._last = now
+        out = {}
+        for stage in self.stages:
+            processed, busy = self._counts[stage.name]
+            self._counts[stage.name] = (stage.processed, stage.busy)
+            out[stage.name] = {
+                "depth": stage.depth,
+                "maxsize": stage.queue.maxsize,
+                "processed": stage.processed,
+                "passed": stage.passed,
+                "errors": stage.errors,
+                "rate": (stage.processed - processed) / elapsed,
+                "utilization": (stage.busy - busy) / (elapsed * stage.workers),
+            }
+        return out
+
+    def summary(self) -> str:
+        """
+        stats() as one log line, e.g. "dedupe 0/100 3.2/s 1% | notify 87/100 0.3/s 95%".
+        """
+        return " | ".join(
+            f"{name} {s['depth']}/{s['maxsize']} {s['rate']:.1f}/s {s['utilization']:.0%}"
+            for name, s in self.stats().items()
+        )
@@ -0,0 +1,70 @@
+import math
+from typing import NamedTuple
+from portalsmp.frame import GiftFrame
+from bot.scoring import DealScorer
+from bot.stats import SaleStats
+
+class AlertRule(NamedTuple):
+    """
+    Parameters that decide which actions are alerted; shared by the live bot and the backtester.
+
+    Attributes:
+        min_score (float): Minimum DealScorer score of an alerted deal.
+        collection_weight (float): Weight of the discount versus the collection floor.
+        model_weight (float): Weight of the discount versus the model floor.
+        backdrop_weight (float): Weight of the discount versus the backdrop floor.
+        rarity_bonus (float): Maximum relative boost for rare traits.
+        max_median_ratio (float): Drop deals priced above this multiple of the recent median sale of
+            their model (or collection, when the model has too few sales); 0 disables the check.
+        sales_window (float): Seconds of sales the median is taken over.
+    """
+    min_score: float = 10.0
+    collection_weight: float = 1.0
+    model_weight: float = 1.5
+    backdrop_weight: float = 0.5
+    rarity_bonus: float = 0.5
+    max_median_ratio: float = 0.0
+    sales_window: float = 86400
+
+    def scorer(self, attr_floors) -> DealScorer:
+        weights = {"collection": self.collection_weight, "model": self.model_weight, "backdrop": self.backdrop_weight}
+        return DealScorer(attr_floors, weights=weights, rarity_bonus=self.rarity_bonus)
+
+def rounded(value: float, digits: int = 2) -> float | None:
+    """
+    NaN (unknown floor) -> None, anything else rounded for display.
+    """
+    return None if math.isnan(value) else round(value, digits)
+
+def find_deals(frame: GiftFrame, scorer: DealScorer, min_score: float, sale_stats: SaleStats | None = None,
+               max_median_ratio: float = 0.0) -> list:
+    """
+    Scores a batch and returns the source actions scoring at least `min_score`, best first.
+
+    Each returned action is annotated in place with name, model, backdrop, price, floor, model_floor,
+    backdrop_floor, drop_percent, model_drop_percent, backdrop_drop_percent and score, and with the
+    recent sales from `sale_stats` when given (see SaleStats.annotate). With `max_median_ratio`, deals
+    priced above that multiple of the model's (or else the collection's) recent median sale are dropped.
+    """
+    ranked, scores = scorer.rank(frame, min_score=min_score)
+    if not len(ranked):
+        return []
+    columns = {field: column.tolist() for field, column in scores._asdict().items()}
+    names, models, backdrops = ranked.names("collection"), ranked.names("model"), ranked.names("backdrop")
+    prices = ranked.price.tolist()
+    deals = []
+    for i, g in enumerate(ranked.items()):
+        g.update(name=names[i], model=models[i], backdrop=backdrops[i], price=prices[i])
+        g["floor"] = rounded(columns["collection_floor"][i])
+        g["model_floor"] = rounded(columns["model_floor"][i])
+        g["backdrop_floor"] = rounded(columns["backdrop_floor"][i])
+        g["drop_percent"] = rounded(columns["collection_drop"][i], 1)
+        g["model_drop_percent"] = rounded(columns["model_drop"][i], 1)
+        g["backdrop_drop_percent"] = rounded(columns["backdrop_drop"][i], 1)
+        g["score"] = rounded(columns["score"][i], 1)
+        deals.append(g)
+    if sale_stats is not None:
+        sale_stats.annotate(deals)
+        if max_median_ratio:
+            deals = [g for g in deals if not (median := g["model_sales_median"] or g["sales_median"]) or g["price"] <= max_median_ratio * median]
+    return deals
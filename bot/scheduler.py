@@ -0,0 +1,115 @@
+import time
+import random
+from collections import deque
+
+class AdaptiveScheduler:
+    """
+    Chooses the delay before the next market poll from the observed activity.
+
+    After every successful poll, record() updates a smoothed rate of new actions per second, and the
+    interval is set so that a poll is expected to find `target_fill` of a page of new items: shorter when
+    pages come back full of new items (a full page halves the interval at once), longer when they come
+    back empty. Errors switch to exponential backoff with full jitter (429 answers start from a longer
+    base). Every delay is kept within [min_interval, max_interval] (backoff may go up to backoff_max),
+    and stretched if needed so that no more than `budget_per_minute` requests are made in any minute.
+
+    Args:
+        min_interval (float): Shortest delay between polls in seconds. Defaults to 10.
+        max_interval (float): Longest delay between successful polls in seconds. Defaults to 120.
+        target_fill (float): Desired share of a page that is new at each poll. Defaults to 0.5.
+        budget_per_minute (int): Maximum requests per rolling minute. Defaults to 30.
+        backoff_base (float): First delay after an error in seconds. Defaults to 15.
+        backoff_max (float): Longest delay after errors in seconds. Defaults to 600.
+        jitter (float): Relative random spread of regular delays. Defaults to 0.2.
+        smoothing (float): Weight of the latest poll in the rate average. Defaults to 0.3.
+        clock (Callable): Time source in seconds. Defaults to time.monotonic; a replay passes portalsmp.replay.clock.
+
+    Attributes:
+        interval (float): Current base interval.
+        rate (float | None): Smoothed new actions per second.
+        errors (int): Consecutive failed polls.
+    """
+    def __init__(self, min_interval: float = 10, max_interval: float = 120, target_fill: float = 0.5, budget_per_minute: int = 30,
+                 backoff_base: float = 15, backoff_max: float = 600, jitter: float = 0.2, smoothing: float = 0.3, clock=time.monotonic):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_fill = target_fill
+        self.budget_per_minute = budget_per_minute
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.smoothing = smoothing
+        self.clock = clock
+        self.interval = max_interval
+        self.rate = None
+        self.errors = 0
+        self._rate_limited = False
+        self._last_poll = None
+        self._last_requests = 1
+        self._requests = deque()
+
+    def record(self, new_items: int, capacity: int, requests: int = 1):
+        """
+        Records a successful poll.
+
+        Args:
+            new_items (int): Number of new actions the poll returned.
+            capacity (int): Number of items one poll returns when everything is new (page size x feeds).
+            requests (int): Number of API requests the poll made.
+        """
+        now = self.clock()
+        self._note_requests(requests, now)
+        self.errors = 0
+        self._rate_limited = False
+
+        if self._last_poll is not None:
+            rate = new_items / max(now - self._last_poll, 1e-3)
+            self.rate = rate if self.rate is None else self.smoothing * rate + (1 - self.smoothing) * self.rate
+        self._last_poll = now
+
+        if new_items >= capacity:
+            self.interval = self.interval / 2
+        elif self.rate:
+            self.interval = self.target_fill * capacity / self.rate
+        else:
+            self.interval = self.interval * 1.5
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+    def record_error(self, error: Exception | None = None, requests: int = 1):
+        """
+        Records a failed poll; a PortalsAPIError with status 429 backs off from a longer base.
+        """
+        self._note_requests(requests, self.clock())
+        self.errors += 1
+        if getattr(error, "status_code", None) == 429:
+            self._rate_limited = True
+
+    def next_delay(self) -> float:
+        """
+        Returns the number of seconds to wait before the next poll.
+        """
+        if self.errors:
+            base = self.backoff_base * (4 if self._rate_limited else 1)
+            delay = random.uniform(self.min_interval, min(self.backoff_max, base * 2 ** (self.errors - 1)))
+        else:
+            delay = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(max(delay, self.min_interval), self.max_interval)
+        return max(delay, self._budget_delay())
+
+    def _note_requests(self, requests: int, now: float):
+        self._last_requests = max(requests, 1)
+        self._requests.extend([now] * requests)
+        while self._requests and self._requests[0] <= now - 60:
+            self._requests.popleft()
+
+    def _budget_delay(self) -> float:
+        # Wait until enough requests leave the one-minute window for a poll as large as the last one.
+        now = self.clock()
+        while self._requests and self._requests[0] <= now - 60:
+            self._requests.popleft()
+        excess = len(self._requests) + self._last_requests - self.budget_per_minute
+        if excess <= 0:
+            return 0.0
+        if excess > len(self._requests):
+            return 60.0
+        return self._requests[excess - 1] + 60 - now
@@ -0,0 +1,108 @@
+from typing import NamedTuple
+import numpy as np
+from portalsmp.frame import GiftFrame
+
+KINDS = ("collection", "model", "backdrop")
+
+class DealScores(NamedTuple):
+    """
+    Per-row scoring results, aligned with the scored frame. Drops are discounts in percent versus
+    each floor (NaN where that floor is unknown); rarity is in [0, 1], 1 being the rarest.
+    """
+    collection_floor: np.ndarray
+    model_floor: np.ndarray
+    backdrop_floor: np.ndarray
+    collection_drop: np.ndarray
+    model_drop: np.ndarray
+    backdrop_drop: np.ndarray
+    rarity: np.ndarray
+    score: np.ndarray
+
+    def take(self, rows) -> "DealScores":
+        return DealScores(*(column[rows] for column in self))
+
+class DealScorer:
+    """
+    Scores a whole GiftFrame at once against collection, model and backdrop floors.
+
+    For every row, the discount versus each known floor is combined into a weighted mean (by default
+    the model floor counts most, since it is the closest comparable). A positive discount is then
+    boosted by the rarity of the model and backdrop: rarity is 1 - log10(rarity_per_mille) / 3, so a
+    1-per-mille trait gives the full `rarity_bonus` and a 1000-per-mille one none. Rows without any
+    floor get a NaN score.
+
+    Model and backdrop floors are looked up in the AttributeFloorIndex once per distinct
+    (collection, trait) pair in the batch, not once per row; the rest is array arithmetic.
+
+    Args:
+        attr_floors (AttributeFloorIndex | None): Model and backdrop floors. Defaults to None (collection floor only).
+        weights (dict | None): Weight of each floor kind. Defaults to {"collection": 1.0, "model": 1.5, "backdrop": 0.5}.
+        rarity_bonus (float): Maximum relative boost for rare traits. Defaults to 0.5.
+
+    Example:
+        frame = GiftFrame(actions, floors=floor_cache)
+        ranked, scores = DealScorer(attr_floors).rank(frame, min_score=10)
+    """
+    def __init__(self, attr_floors=None, weights: dict | None = None, rarity_bonus: float = 0.5):
+        self.attr_floors = attr_floors
+        self.weights = {"collection": 1.0, "model": 1.5, "backdrop": 0.5, **(weights or {})}
+        self.rarity_bonus = rarity_bonus
+
+    def floors(self, frame: GiftFrame, kind: str) -> np.ndarray:
+        """
+        Returns the floor of every row for a kind ("collection", "model" or "backdrop"), NaN where unknown.
+        """
+        if kind == "collection":
+            return frame.floor
+        out = np.full(len(frame), np.nan)
+        if self.attr_floors is None or not len(frame):
+            return out
+
+        codes = getattr(frame, kind)
+        valid = (frame.collection >= 0) & (codes >= 0)
+        width = max(len(frame.categories[kind]), 1)
+        keys = frame.collection[valid].astype(np.int64) * width + codes[valid]
+        unique, inverse = np.unique(keys, return_inverse=True)
+
+        collections = {code: name for name, code in frame.categories["collection"].items()}
+        values = {code: name for name, code in frame.categories[kind].items()}
+        table = np.array(
+            [self.attr_floors.get(collections[key // width], kind, values[key % width]) or np.nan for key in unique.tolist()],
+            dtype=np.float64,
+        )
+        out[valid] = table[inverse]
+        return out
+
+    def score(self, frame: GiftFrame) -> DealScores:
+        """
+        Scores every row of the frame.
+        """
+        floors = [self.floors(frame, kind) for kind in KINDS]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drops = np.stack([100 * (1 - frame.price / floor) for floor in floors])
+        drops[~(np.stack(floors) > 0)] = np.nan
+
+        known = ~np.isnan(drops)
+        weights = np.array([self.weights[kind] for kind in KINDS])[:, None] * known
+        total = weights.sum(axis=0)
+        weighted = (np.where(known, drops, 0) * weights).sum(axis=0)
+        combined = np.where(total > 0, weighted / np.maximum(total, 1e-12), np.nan)
+
+        per_mille = np.stack([frame.model_rarity, frame.backdrop_rarity]).astype(np.float64)
+        rare = np.clip(1 - np.log10(np.clip(per_mille, 1, None)) / 3, 0, 1)
+        rated = ~np.isnan(rare)
+        count = rated.sum(axis=0)
+        rarity = np.where(count > 0, np.where(rated, rare, 0).sum(axis=0) / np.maximum(count, 1), 0.0)
+
+        score = np.where(combined > 0, combined * (1 + self.rarity_bonus * rarity), combined)
+        return DealScores(*floors, *drops, rarity, score)
+
+    def rank(self, frame: GiftFrame, min_score: float | None = None, k: int | None = None) -> tuple:
+        """
+        Returns (frame, scores) for the rows scoring at least `min_score`, best first, at most `k` of them.
+        """
+        scores = self.score(frame)
+        keys = np.where(np.isnan(scores.score), -np.inf, scores.score)
+        rows = np.flatnonzero(keys >= min_score) if min_score is not None else np.arange(len(keys))
+        order = rows[np.argsort(-keys[rows], kind="stable")][:k]
+        return frame.take(order), scores.take(order)
@@ -0,0 +1,95 @@
+import os
+import time
+import pickle
+import sqlite3
+import logging
+
+class SeenStore:
+    """
+    Bounded, durable set of already processed ids.
+
+    Membership checks hit an in-memory dict of the ids seen within the retention window (capped at
+    max_size, oldest evicted first). New ids are buffered and flush() appends only those to SQLite, so
+    a cycle costs O(new ids) regardless of history size. Rows older than the retention window are
+    deleted periodically, and startup loads only the retained ids.
+
+    Args:
+        path (str): SQLite database file.
+        retention (float): Seconds an id is remembered. Defaults to 7 days.
+        max_size (int): Maximum number of ids kept in memory. Defaults to 200000.
+        legacy_pickle (str | None): Old seen_ids.pickle to import once (renamed to *.migrated afterwards).
+        prune_every (float): Minimum seconds between deletions of expired rows. Defaults to 1 hour.
+    """
+    def __init__(self, path: str, retention: float = 7 * 86400, max_size: int = 200_000, legacy_pickle: str | None = None, prune_every: float = 3600):
+        self.path = path
+        self.retention = retention
+        self.max_size = max_size
+        self.prune_every = prune_every
+        self._ids = {}
+        self._pending = []
+        self._last_prune = 0.0
+
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS seen_at_idx ON seen (seen_at)")
+        self._db.commit()
+
+        if legacy_pickle and os.path.exists(legacy_pickle):
+            self._migrate(legacy_pickle)
+        self._load()
+
+    def __contains__(self, gid) -> bool:
+        return str(gid) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, gid):
+        gid = str(gid)
+        if gid in self._ids:
+            return
+        now = time.time()
+        self._ids[gid] = now
+        self._pending.append((gid, now))
+        if len(self._ids) > self.max_size:
+            del self._ids[next(iter(self._ids))]
+
+    def flush(self):
+        """
+        Writes ids added since the last flush and drops expired ones.
+        """
+        if self._pending:
+            self._db.executemany("INSERT OR REPLACE INTO seen (id, seen_at) VALUES (?, ?)", self._pending)
+            self._db.commit()
+            self._pending = []
+
+        now = time.time()
+        cutoff = now - self.retention
+        while self._ids and next(iter(self._ids.values())) < cutoff:
+            del self._ids[next(iter(self._ids))]
+        if now - self._last_prune >= self.prune_every:
+            self._db.execute("DELETE FROM seen WHERE seen_at < ?", (cutoff,))
+            self._db.commit()
+            self._last_prune = now
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT id, seen_at FROM seen WHERE seen_at >= ? ORDER BY seen_at DESC LIMIT ?",
+            (time.time() - self.retention, self.max_size),
+        ).fetchall()
+        self._ids = dict(reversed(rows))
+
+    def _migrate(self, legacy_pickle: str):
+        with open(legacy_pickle, "rb") as f:
+            ids = pickle.load(f)
+        now = time.time()
+        self._db.executemany("INSERT OR IGNORE INTO seen (id, seen_at) VALUES (?, ?)", ((str(gid), now) for gid in ids))
+        self._db.commit()
+        os.replace(legacy_pickle, legacy_pickle + ".migrated")
+        logging.info(f"[SEEN] Imported {len(ids)} ids from {legacy_pickle}")
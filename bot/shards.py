@@ -0,0 +1,125 @@
+import json
+import asyncio
+import logging
+from typing import NamedTuple
+from collections import OrderedDict
+from portalsmp.activity_feed import ActivityFeed, action_key, action_time
+
+class WatchShard(NamedTuple):
+    """
+    One watched slice of the market.
+
+    Attributes:
+        name (str): Shard name, used in logs.
+        filters (dict): marketActivity filters (gift_name, model, backdrop, symbol, min_price, max_price, activityType).
+    """
+    name: str
+    filters: dict
+
+def parse_shards(text: str) -> list:
+    """
+    Parses shards from JSON: a list of objects holding marketActivity filters and an optional "name".
+
+    Example:
+        [{"name": "pepe", "gift_name": "Plush Pepe"}, {"name": "cheap black", "backdrop": "Black", "max_price": 20}]
+
+    An empty string gives a single unfiltered shard.
+    """
+    if not text.strip():
+        return [WatchShard("all", {})]
+    shards = []
+    for i, spec in enumerate(json.loads(text)):
+        filters = dict(spec)
+        shards.append(WatchShard(str(filters.pop("name", f"shard{i}")), filters))
+    return shards
+
+class _Limited:
+    # Client proxy that holds a shared semaphore for every marketActivity request.
+    def __init__(self, client, semaphore: asyncio.Semaphore):
+        self.client = client
+        self.semaphore = semaphore
+
+    async def marketActivity(self, **kwargs):
+        async with self.semaphore:
+            return await self.client.marketActivity(**kwargs)
+
+class ShardedFeed:
+    """
+    Several ActivityFeeds, one per WatchShard, polled concurrently and merged into one stream.
+
+    A quiet collection no longer competes with busy ones for the same 20-item page: each shard pages
+    through its own filtered feed. At most `max_concurrency` marketActivity requests run at once across
+    all shards. poll() returns the new actions of all shards, de-duplicated (an action matching several
+    shards is returned once) and ordered by creation time. A failing shard is logged and skipped.
+
+    Args:
+        client (AsyncPortalsClient): Client used for marketActivity requests.
+        shards (list): WatchShard list.
+        max_concurrency (int): Maximum number of simultaneous requests. Defaults to 4.
+        remember (int): Number of recent action keys kept for cross-shard de-duplication. Defaults to 4096.
+        **feed_kwargs: ActivityFeed options (limit, max_pages, fresh_sec, ...).
+    """
+    def __init__(self, client, shards: list, max_concurrency: int = 4, remember: int = 4096, **feed_kwargs):
+        limited = _Limited(client, asyncio.Semaphore(max_concurrency))
+        self.shards = shards
+        self.feeds = {shard.name: ActivityFeed(limited, **feed_kwargs, **shard.filters) for shard in shards}
+        self.remember = remember
+        self.errors = {}
+        self._seen = OrderedDict()
+
+    @property
+    def requests(self) -> int:
+        return sum(feed.requests for feed in self.feeds.values())
+
+    @property
+    def gaps(self) -> int:
+        return sum(feed.gaps for feed in self.feeds.values())
+
+    @property
+    def capacity(self) -> int:
+        """Number of actions one poll returns when the first page of every shard is all new."""
+        return sum(feed.limit for feed in self.feeds.values())
+
+    @property
+    def max_pages(self) -> int:
+        return max(feed.max_pages for feed in self.feeds.values())
+
+    def resume(self, keys: list, newest: float | None = None):
+        """
+        Marks actions as already returned in every shard (see ActivityFeed.resume).
+        """
+        for feed in self.feeds.values():
+            feed.resume(keys, newest)
+        for key in keys:
+            self._seen[key] = None
+        while len(self._seen) > self.remember:
+            self._seen.popitem(last=False)
+
+    async def poll(self) -> list:
+        """
+        Polls every shard and returns the merged new actions, oldest first.
+        """
+        names = list(self.feeds)
+        results = await asyncio.gather(*(self.feeds[name].poll() for name in names), return_exceptions=True)
+
+        merged = []
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self.errors[name] = result
+                logging.error(f"[SHARD {name}] {result}")
+                continue
+            self.errors.pop(name, None)
+            for action in result:
+                key = action_key(action)
+                if key in self._seen:
+                    continue
+                self._seen[key] = None
+                action["shard"] = name
+                merged.append(action)
+        if len(self.feeds) == len(self.errors):
+            raise next(iter(self.errors.values()))
+
+        while len(self._seen) > self.remember:
+            self._seen.popitem(last=False)
+        merged.sort(key=lambda action: action_time(action) or 0)
+        return merged
@@ -0,0 +1,159 @@
+import itertools
+from typing import NamedTuple
+from sortedcontainers import SortedList
+from portalsmp.activity_feed import action_time
+
+class SaleSummary(NamedTuple):
+    """
+    Recent sales of one collection or model.
+
+    Attributes:
+        count (int): Sales within the window.
+        volume (float): Sum of their prices in TON.
+        median (float): Median sale price.
+        p25 (float): 25th percentile sale price.
+        p75 (float): 75th percentile sale price.
+        last_price (float): Price of the latest sale.
+        last_time (float): UNIX time of the latest sale.
+    """
+    count: int
+    volume: float
+    median: float
+    p25: float
+    p75: float
+    last_price: float
+    last_time: float
+
+class RollingWindow:
+    """
+    Sale prices of the last `window` seconds, ordered both by time (for expiry) and by price (for
+    percentiles). Adding, expiring and reading a percentile each cost O(log n); events may arrive
+    out of order.
+
+    Args:
+        window (float): Width of the window in seconds.
+    """
+    __slots__ = ("window", "volume", "_by_time", "_prices")
+    _seq = itertools.count()
+
+    def __init__(self, window: float):
+        self.window = window
+        self.volume = 0.0
+        self._by_time = SortedList()
+        self._prices = SortedList()
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def add(self, t: float, price: float):
+        # the sequence number keeps equal (t, price) sales apart
+        self._by_time.add((t, next(self._seq), price))
+        self._prices.add(price)
+        self.volume += price
+
+    def expire(self, now: float):
+        cutoff = now - self.window
+        while self._by_time and self._by_time[0][0] < cutoff:
+            _, _, price = self._by_time.pop(0)
+            self._prices.remove(price)
+            self.volume -= price
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the q-quantile (0..1) of the prices in the window, interpolated between neighbours.
+        """
+        position = q * (len(self._prices) - 1)
+        low = int(position)
+        if low + 1 >= len(self._prices):
+            return self._prices[low]
+        return self._prices[low] + (self._prices[low + 1] - self._prices[low]) * (position - low)
+
+    def summary(self) -> SaleSummary | None:
+        if not self._prices:
+            return None
+        last_time, _, last_price = self._by_time[-1]
+        return SaleSummary(len(self._prices), round(self.volume, 9), self.quantile(0.5), self.quantile(0.25),
+                           self.quantile(0.75), last_price, last_time)
+
+class SaleStats:
+    """
+    Rolling sale statistics per collection and per (collection, model), fed by the activity stream.
+
+    update() takes "buy" actions as they are polled; every other action type is ignored. The window
+    end is the newest sale time seen (not the wall clock), so the statistics are the same whether
+    the stream is live or replayed. Each sale costs O(log n) in its collection and model windows;
+    windows are expired lazily, when they receive a sale or are read.
+
+    Args:
+        window (float): Seconds of sales kept. Defaults to 24 hours.
+        min_sales (int): Sales needed before get() reports a window. Defaults to 3.
+
+    Attributes:
+        clock (float | None): Time of the newest sale seen.
+        sales (int): Sales added since creation.
+
+    Example:
+        stats = SaleStats(window=6 * 3600)
+        stats.update(actions)
+        stats.get("Plush Pepe", "Gummy Frog").median
+    """
+    def __init__(self, window: float = 86400, min_sales: int = 3):
+        self.window = window
+        self.min_sales = min_sales
+        self.clock = None
+        self.sales = 0
+        self._windows = {}
+
+    def _add(self, key: tuple, t: float, price: float):
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = RollingWindow(self.window)
+        window.add(t, price)
+        window.expire(self.clock)
+
+    def update(self, actions: list):
+        for action in actions:
+            if action.get("type") != "buy":
+                continue
+            t = action_time(action)
+            try:
+                price = float(action.get("amount"))
+            except (TypeError, ValueError):
+                continue
+            if t is None or (self.clock is not None and t < self.clock - self.window):
+                continue
+            self.clock = t if self.clock is None else max(self.clock, t)
+            nft = action.get("nft") or {}
+            name = nft.get("name")
+            model = next((a.get("value") for a in nft.get("attributes") or () if a.get("type") == "model"), None)
+            self._add((name, None), t, price)
+            if model is not None:
+                self._add((name, model), t, price)
+            self.sales += 1
+
+    def get(self, collection: str, model: str | None = None) -> SaleSummary | None:
+        """
+        Returns the sales of a collection (or of one of its models) within the window, or None when
+        there are fewer than min_sales.
+        """
+        window = self._windows.get((collection, model))
+        if window is None:
+            return None
+        window.expire(self.clock)
+        if len(window) < self.min_sales:
+            return None
+        return window.summary()
+
+    def annotate(self, deals: list) -> list:
+        """
+        Adds the recent sales of each deal's collection and model to it, as returned by find_deals():
+        sales_median, sales_count, last_sale, model_sales_median, model_sales_count (None when unknown).
+        """
+        for g in deals:
+            collection, model = self.get(g.get("name")), self.get(g.get("name"), g.get("model"))
+            g["sales_median"] = round(collection.median, 2) if collection else None
+            g["sales_count"] = collection.count if collection else 0
+            g["last_sale"] = collection.last_price if collection else None
+            g["model_sales_median"] = round(model.median, 2) if model else None
+            g["model_sales_count"] = model.count if model else 0
+        return deals
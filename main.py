@@ -1,13 +1,24 @@
 # main.py
 import os
+import json
 import time
-import random
-import pickle
 import logging
 import asyncio
+import contextlib
 from pyrogram import Client
 import portalsmp as pm
-from playwright.async_api import async_playwright
+from bot.seen_store import SeenStore
+from bot.history import HistoryStore
+from bot.stats import SaleStats
+from bot.cloudflare import CloudflareBrowser
+from bot.notifier import Notifier
+from bot.shards import ShardedFeed, parse_shards
+from bot.scheduler import AdaptiveScheduler
+from bot.pipeline import Pipeline, Stage
+from bot.rules import AlertRule, find_deals
+from portalsmp.frame import GiftFrame
+from portalsmp import replay
+from portalsmp.metrics import REGISTRY, serve as serve_metrics
 
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] %(levelname)s: %(message)s')
 
@@ -17,17 +28,42 @@ BOT_TOKEN      = os.environ.get("BOT_TOKEN", "").strip()
 API_ID         = int(os.environ["API_ID"])
 API_HASH       = os.environ["API_HASH"]
 CHANNEL        = os.environ["CHANNEL"]
+AUTH_DATA      = os.environ.get("AUTH_DATA", "").strip()
+AUTH_TTL_SEC   = int(os.environ.get("AUTH_TTL_SEC", 3600))
 
 MIN_DROP_PERCENT = int(os.environ.get("MIN_DROP_PERCENT", 10))
-SEEN_FILE = "seen_ids.pickle"
-seen_ids = set()
-if os.path.exists(SEEN_FILE):
-    with open(SEEN_FILE, "rb") as f:
-        seen_ids = pickle.load(f)
-
-def save_seen_ids():
-    with open(SEEN_FILE, "wb") as f:
-        pickle.dump(seen_ids, f)
+MIN_SCORE = float(os.environ.get("MIN_SCORE", MIN_DROP_PERCENT))
+SCORE_WEIGHTS = json.loads(os.environ.get("SCORE_WEIGHTS", "{}"))
+RARITY_BONUS = float(os.environ.get("RARITY_BONUS", 0.5))
+FRESH_SEC = int(os.environ.get("FRESH_SEC", 0)) or None
+FLOOR_TTL_SEC = int(os.environ.get("FLOOR_TTL_SEC", 300))
+ATTR_FLOOR_TTL_SEC = int(os.environ.get("ATTR_FLOOR_TTL_SEC", 900))
+WATCH_SHARDS = parse_shards(os.environ.get("WATCH_SHARDS", ""))
+SHARD_CONCURRENCY = int(os.environ.get("SHARD_CONCURRENCY", 4))
+SEEN_DB = os.environ.get("SEEN_DB", "seen_ids.sqlite3")
+SEEN_TTL_SEC = int(os.environ.get("SEEN_TTL_SEC", 7 * 86400))
+HISTORY_DIR = os.environ.get("HISTORY_DIR", "").strip()
+SALES_WINDOW_SEC = int(os.environ.get("SALES_WINDOW_SEC", 86400))
+MAX_MEDIAN_RATIO = float(os.environ.get("MAX_MEDIAN_RATIO", 0))
+ALERT_RULE = AlertRule(min_score=MIN_SCORE, rarity_bonus=RARITY_BONUS, max_median_ratio=MAX_MEDIAN_RATIO, sales_window=SALES_WINDOW_SEC,
+                       **{f"{kind}_weight": weight for kind, weight in SCORE_WEIGHTS.items()})
+CHECK_MIN = int(os.environ.get("CHECK_MIN", 10))
+CHECK_MAX = int(os.environ.get("CHECK_MAX", 120))
+REQUESTS_PER_MIN = int(os.environ.get("REQUESTS_PER_MIN", 30))
+PIPELINE_QUEUE = int(os.environ.get("PIPELINE_QUEUE", 500))
+PIPELINE_STATS_SEC = int(os.environ.get("PIPELINE_STATS_SEC", 60))
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 0))
+PORTALS_RECORD = os.environ.get("PORTALS_RECORD", "").strip()
+PORTALS_REPLAY = os.environ.get("PORTALS_REPLAY", "").strip()
+# REPLAY_SPEED: во сколько раз быстрее живого проигрывается архив — и задержки ответов, и паузы между
+# опросами делятся на него; 0 — без ожидания вообще, архив прогоняется на полной скорости
+REPLAY_SPEED = float(os.environ.get("REPLAY_SPEED", 0))
+FETCHED = REGISTRY.counter("bot_actions_fetched_total", "Market actions pulled from the activity feed.")
+FRESH = REGISTRY.counter("bot_actions_fresh_total", "Actions left after dropping already alerted ones.")
+ALERTED = REGISTRY.counter("bot_deals_alerted_total", "Deals that passed MIN_SCORE and were sent to the channel.")
+seen_ids = SeenStore(SEEN_DB, retention=SEEN_TTL_SEC, legacy_pickle="seen_ids.pickle")
+history = HistoryStore(HISTORY_DIR) if HISTORY_DIR else None
+sale_stats = SaleStats(window=ALERT_RULE.sales_window)
 
 def make_client():
     if SESSION_STRING and len(SESSION_STRING) > 100:
@@ -37,83 +73,162 @@ def make_client():
     else:
         raise RuntimeError("Нет SESSION_STRING или BOT_TOKEN")
 
-async def bypass_cf():
-    """Имитация поведения пользователя через Playwright для обхода Cloudflare"""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=(
-            "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) "
-            "AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/20A5346a TelegramBot/8.0"
-        ))
-        page = await context.new_page()
-        await page.goto("https://portals-market.com", wait_until="domcontentloaded")
-        await asyncio.sleep(random.uniform(2, 5))
-        for _ in range(random.randint(2, 5)):
-            await page.mouse.wheel(0, random.randint(300, 700))
-            await asyncio.sleep(random.uniform(0.3, 1.0))
-        await browser.close()
-        logging.info("[CF] Bypass done")
-
-async def fetch_gifts():
-    """Используем portalsmp для получения activity"""
-    try:
-        gifts = pm.marketActivity()
-        logging.info(f"[PORTALSMP] Pulled {len(gifts)} gifts")
-        return gifts
-    except Exception as e:
-        logging.error(f"[PORTALSMP ERROR] {e}")
-        return []
-
-def filter_gifts(items):
-    out = []
-    for g in items:
-        gid = g.get("id")
-        if not gid or gid in seen_ids:
-            continue
-        price = g.get("price") or 0
-        floor = g.get("floor") or 0
-        drop_percent = 100*(1-price/floor) if floor>0 else 0
-        if drop_percent >= MIN_DROP_PERCENT:
-            g["drop_percent"] = round(drop_percent,1)
-            out.append(g)
-            seen_ids.add(gid)
-    logging.info(f"[FILTER] {len(items)} gifts -> {len(out)} fresh gifts")
-    return out
-
-async def one_cycle(app):
-    await bypass_cf()
-    gifts = await fetch_gifts()
-    filtered = filter_gifts(gifts)
-    for g in filtered:
-        msg = (
-            f"🎁 <b>{g.get('name')}</b>\n"
-            f"💰 Price: {g.get('price')} TON\n"
-            f"🏷 Floor: {g.get('floor')} TON\n"
-            f"💸 Drop: {g.get('drop_percent')}%\n"
-            f"🌑 BG: {g.get('backdrop')}\n"
-            f"🔗 <a href='{g.get('link')}'>Open</a>"
-        )
+async def fetch_gifts(feed):
+    """Используем portalsmp для получения новых действий из activity; ошибки уходят в планировщик"""
+    gaps = feed.gaps
+    gifts = await feed.poll()
+    logging.info(f"[PORTALSMP] Pulled {len(gifts)} new gifts ({feed.requests} requests total)")
+    if feed.gaps > gaps:
+        logging.warning(f"[PORTALSMP] Activity burst exceeded {feed.max_pages} pages, some actions may be missed")
+    return gifts
+
+def is_new(batch):
+    fresh = [g for g in batch if (gid := pm.action_key(g)) and gid not in seen_ids]
+    FRESH.inc(amount=len(fresh))
+    return fresh or None
+
+def score(frame, scorer):
+    """Оцениваем всю пачку разом и возвращаем сделки лучше MIN_SCORE, лучшие первыми"""
+    # то же правило, что проверяет bot.backtest: скор и сверка с медианой реальных продаж
+    deals = find_deals(frame, scorer, ALERT_RULE.min_score, sale_stats, ALERT_RULE.max_median_ratio)
+    for g in deals:
+        seen_ids.add(pm.action_key(g))
+    ALERTED.inc(amount=len(deals))
+    logging.info(f"[SCORE] {len(frame)} gifts -> {len(deals)} deals")
+    return deals or None
+
+def format_message(g):
+    return (
+        f"🎁 <b>{g.get('name')}</b>\n"
+        f"💰 Price: {g.get('price')} TON\n"
+        f"🏷 Floor: {g.get('floor')} TON\n"
+        f"💸 Drop: {g.get('drop_percent')}%\n"
+        f"🧬 Model {g.get('model')}: floor {g.get('model_floor')} TON, drop {g.get('model_drop_percent')}%\n"
+        f"🌑 BG {g.get('backdrop')}: floor {g.get('backdrop_floor')} TON, drop {g.get('backdrop_drop_percent')}%\n"
+        f"📈 Sales {SALES_WINDOW_SEC / 3600:g}h: median {g.get('sales_median')} TON ({g.get('sales_count')}), "
+        f"model {g.get('model_sales_median')} TON ({g.get('model_sales_count')}), last {g.get('last_sale')} TON\n"
+        f"⭐ Score: {g.get('score')}\n"
+        f"🔗 <a href='{g.get('link')}'>Open</a>"
+    )
+
+async def poll_forever(app, api, feed, floors, scheduler):
+    """Источник конвейера: опрашиваем activity по расписанию и отдаём каждую пачку новых действий"""
+    tape = replay.current()
+    while True:
+        requests = feed.requests
+        repeats = tape.repeats["marketActivity"] if tape is not None and tape.replaying else 0
         try:
-            await app.send_message(CHANNEL, msg, disable_web_page_preview=False)
-            await asyncio.sleep(random.uniform(0.5,1.3))
+            me = await app.get_me()
+            logging.info(f"[TG] Connected as @{getattr(me,'username',me.id)}")
+            gifts = await fetch_gifts(feed)
+            FETCHED.inc(amount=len(gifts))
+            sale_stats.update(gifts)
+            if history:
+                # сохраняем всё, что пришло, а не только сделки — для вопросов о прошлом без повторной загрузки
+                history.add_actions(gifts)
+            logging.info(f"[CF] {api.challenges} challenges, {api.solves} solves so far")
+            if floors.last_error:
+                logging.warning(f"[FLOORS] Using floors from {floors.age:.0f}s ago: {floors.last_error}")
+            if feed.errors:
+                # часть шардов упала (например, 429) — тоже притормаживаем
+                scheduler.record_error(next(iter(feed.errors.values())), feed.requests - requests)
+            else:
+                scheduler.record(len(gifts), feed.capacity, feed.requests - requests)
+            # пока мы ждём следующего опроса, остальные стадии разбирают эту пачку
+            if gifts:
+                yield gifts
         except Exception as e:
-            logging.error(f"[SEND ERROR] {e}")
-    save_seen_ids()
+            logging.error(f"[LOOP ERROR] {e}")
+            scheduler.record_error(e, feed.requests - requests)
+        interval = scheduler.next_delay()
+        rate = f"{scheduler.rate * 60:.1f}/min" if scheduler.rate is not None else "n/a"
+        logging.info(f"[WAIT] Next check in {interval:.0f} sec (new actions {rate}, errors in a row {scheduler.errors})")
+        if tape is not None and tape.replaying:
+            if tape.repeats["marketActivity"] > repeats:
+                # лента активности в архиве кончилась — дальше были бы одни повторы
+                logging.info(f"[REPLAY] Archive played through: {tape.hits} responses, {tape.misses} not recorded")
+                return
+            interval = interval / REPLAY_SPEED if REPLAY_SPEED else 0
+        await asyncio.sleep(interval)
+
+def build_pipeline(source, notifier, floors, scorer):
+    """Конвейер бота: dedupe -> enrich -> score -> notify; его же гоняет benchmarks.run"""
+    def notify(deals):
+        for g in deals:
+            notifier.send(CHANNEL, format_message(g), disable_web_page_preview=False)
+        return deals
+
+    # по конвейеру идут пачки: одна пачка = новые действия одного опроса
+    return Pipeline(source, [
+        Stage("dedupe", is_new, maxsize=PIPELINE_QUEUE),
+        Stage("enrich", lambda batch: GiftFrame(batch, floors=floors), maxsize=PIPELINE_QUEUE),
+        Stage("score", lambda frame: score(frame, scorer), maxsize=PIPELINE_QUEUE),
+        Stage("notify", notify, maxsize=PIPELINE_QUEUE),
+    ])
 
 async def monitor_loop():
     cli = make_client()
     async with cli as app:
+        # authData берём из того же соединения Pyrogram; боты web app не открывают, им нужен AUTH_DATA
+        me = await app.get_me()
+        auth = None if me.is_bot else pm.AuthProvider(app, lifetime=AUTH_TTL_SEC)
+        async with CloudflareBrowser() as cf, \
+                (auth or contextlib.nullcontext()), \
+                pm.AsyncPortalsClient(AUTH_DATA, challenge_solver=cf.refresh, auth=auth) as api, \
+                pm.FloorCache(api, ttl=FLOOR_TTL_SEC) as floors, \
+                pm.AttributeFloorIndex(api, ttl=ATTR_FLOOR_TTL_SEC) as attr_floors, \
+                Notifier(app) as notifier:
+            await monitor(app, notifier, api, floors, attr_floors)
+
+async def monitor(app, notifier, api, floors, attr_floors):
+    feed = ShardedFeed(api, WATCH_SHARDS, max_concurrency=SHARD_CONCURRENCY, fresh_sec=FRESH_SEC)
+    # при проигрывании архива время идёт по его часам, иначе свежесть и темп считались бы по настоящим
+    scheduler = AdaptiveScheduler(min_interval=CHECK_MIN, max_interval=CHECK_MAX, budget_per_minute=REQUESTS_PER_MIN,
+                                  clock=replay.clock if PORTALS_REPLAY else time.monotonic)
+
+    scorer = ALERT_RULE.scorer(attr_floors)
+    if history:
+        # продолжаем ленту с того места, где остановился прошлый запуск: иначе первый опрос вернёт
+        # уже сохранённые действия, и они попадут в историю и статистику второй раз
+        keys, newest = history.recent_keys(feed.remember)
+        feed.resume(keys, newest)
+        # статистику продаж поднимаем из локальной истории, без запросов к API
+        sale_stats.update(r.data for r in history.scan(since=time.time() - SALES_WINDOW_SEC, types=("buy",)))
+        logging.info(f"[STATS] Loaded {sale_stats.sales} sales of the last {SALES_WINDOW_SEC}s from {HISTORY_DIR}")
+
+    pipeline = build_pipeline(poll_forever(app, api, feed, floors, scheduler), notifier, floors, scorer)
+
+    async def report():
         while True:
-            try:
-                me = await app.get_me()
-                logging.info(f"[TG] Connected as @{getattr(me,'username',me.id)}")
-                await one_cycle(app)
-                interval = random.randint(60, 120)
-                logging.info(f"[WAIT] Next check in {interval} sec...")
-                await asyncio.sleep(interval)
-            except Exception as e:
-                logging.error(f"[LOOP ERROR] {e}")
-                await asyncio.sleep(15)
+            await asyncio.sleep(PIPELINE_STATS_SEC)
+            seen_ids.flush()
+            if history:
+                history.flush()
+            logging.info(f"[PIPELINE] {pipeline.fetched} batches fetched | {pipeline.summary()}")
+            logging.info(f"[NOTIFY] {notifier.queue.qsize()} queued, {notifier.sent} sent, {notifier.failed} failed")
+
+    REGISTRY.gauge("bot_pipeline_queue_depth", "Items waiting in each pipeline stage.", ("stage",),
+                   fn=lambda: {(stage.name,): stage.depth for stage in pipeline.stages})
+    REGISTRY.gauge("bot_notify_queue_depth", "Messages waiting to be sent.", fn=lambda: notifier.queue.qsize())
+    REGISTRY.gauge("bot_poll_interval_seconds", "Current base polling interval.", fn=lambda: scheduler.interval)
+    if METRICS_PORT:
+        serve_metrics(METRICS_PORT)
+        logging.info(f"[METRICS] Serving on http://127.0.0.1:{METRICS_PORT}/metrics")
+
+    reporter = asyncio.create_task(report())
+    try:
+        await pipeline.run()
+    finally:
+        reporter.cancel()
+        seen_ids.flush()
+        if history:
+            history.close()
 
 if __name__ == "__main__":
-    asyncio.run(monitor_loop())
+    # PORTALS_RECORD пишет весь трафик Portals в архив, PORTALS_REPLAY проигрывает его без сети
+    with contextlib.ExitStack() as stack:
+        if PORTALS_REPLAY:
+            stack.enter_context(replay.replaying(PORTALS_REPLAY, speed=REPLAY_SPEED or None))
+        elif PORTALS_RECORD:
+            stack.enter_context(replay.recording(PORTALS_RECORD))
+        asyncio.run(monitor_loop())
@@ -1,9 +1,17 @@
 from portalsmp.portalsapi import *
+from portalsmp.session import PortalsSession
+from portalsmp.async_client import AsyncPortalsClient
+from portalsmp.activity_feed import ActivityFeed, action_key, action_time
+from portalsmp.pagination import iter_search, aiter_search
+from portalsmp.floors import FloorCache, AttributeFloorIndex
+from portalsmp.auth import AuthProvider
 
 __all__ = [
     "cap",
     "listToURL",
     "update_auth",
+    "request_auth",
+    "AuthProvider",
     "search",
     "giftsFloors",
     "myPortalsGifts",
@@ -21,5 +29,16 @@ __all__ = [
     "cancelOffer",
     "changePrice",
     "PortalsGift",
-    "withdrawPortals"
+    "withdrawPortals",
+    "PortalsSession",
+    "AsyncPortalsClient",
+    "ActivityFeed",
+    "action_key",
+    "action_time",
+    "iter_search",
+    "aiter_search",
+    "FloorCache",
+    "AttributeFloorIndex",
+    "PortalsAPIError",
+    "CloudflareChallenge"
 ]
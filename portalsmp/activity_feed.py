@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from portalsmp import replay
+
+def action_key(action: dict) -> str:
+    """
+    Returns a stable identifier for a market action.
+
+    Uses the action "id" when the API provides one, otherwise the NFT id, action type and creation time.
+    """
+    if action.get("id"):
+        return str(action["id"])
+    nft_id = action.get("nft_id") or (action.get("nft") or {}).get("id")
+    return f"{nft_id}:{action.get('type')}:{action.get('created_at')}"
+
+def action_time(action: dict) -> float | None:
+    """
+    Returns the creation time of a market action as a UNIX timestamp, or None if it is missing or unparsable.
+    """
+    created_at = action.get("created_at")
+    if not created_at:
+        return None
+    try:
+        moment = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+class ActivityFeed:
+    """
+    Incremental market activity feed built on marketActivity(sort="latest").
+
+    Each poll() pages backward from the newest action only until it reaches an action returned by an
+    earlier poll, and returns exactly the new actions, oldest first. A quiet period costs one request
+    per poll; a burst is followed across pages instead of being cut off at one page.
+
+    The first poll returns one page, or everything newer than fresh_sec when it is set. Later polls
+    return every unseen action however long ago it was created, so a long pause between polls loses
+    nothing.
+
+    Args:
+        client (AsyncPortalsClient): Client used for marketActivity requests.
+        limit (int): Page size. Defaults to 20.
+        max_pages (int): Maximum number of pages fetched per poll. Defaults to 10.
+        fresh_sec (float | None): On the first poll, ignore actions older than this many seconds. Defaults to None (one page).
+        remember (int): Number of recent action keys kept to detect already seen data. Defaults to 2048.
+        **filters: Extra marketActivity filters (activityType, gift_name, model, backdrop, symbol, min_price, max_price, authData).
+
+    Attributes:
+        requests (int): Total number of marketActivity requests made.
+        gaps (int): Number of polls that hit max_pages before reaching seen data (some actions may have been missed).
+    """
+    def __init__(self, client, limit: int = 20, max_pages: int = 10, fresh_sec: float | None = None, remember: int = 2048, **filters):
+        self.client = client
+        self.limit = limit
+        self.max_pages = max_pages
+        self.fresh_sec = fresh_sec
+        self.remember = remember
+        self.filters = filters
+        self.newest = None
+        self.requests = 0
+        self.gaps = 0
+        self._primed = False
+        self._seen = OrderedDict()
+
+    def resume(self, keys: list, newest: float | None = None):
+        """
+        Marks actions as already returned, e.g. the ones a previous run stored, so the next poll
+        stops at them instead of returning them again.
+
+        Args:
+            keys (list): action_key values, oldest first.
+            newest (float | None): Creation time of the newest of them.
+        """
+        for key in keys:
+            self._seen[key] = None
+        while len(self._seen) > self.remember:
+            self._seen.popitem(last=False)
+        if newest is not None and (self.newest is None or newest > self.newest):
+            self.newest = newest
+
+    async def poll(self) -> list:
+        """
+        Fetches and returns the actions that appeared since the previous poll, oldest first.
+        """
+        cutoff = None
+        batch = {}
+        reached = False
+
+        for page_number in range(self.max_pages):
+            page = await self.client.marketActivity(sort="latest", offset=page_number * self.limit, limit=self.limit, **self.filters)
+            self.requests += 1
+            if not isinstance(page, list):
+                page = []
+            if page_number == 0 and self.fresh_sec and not self._primed:
+                # read after the request, so a replay measures freshness on the tape's clock
+                cutoff = replay.clock() - self.fresh_sec
+
+            for action in page:
+                key = action_key(action)
+                created = action_time(action)
+                if key in self._seen or (created is not None and self.newest is not None and created < self.newest):
+                    reached = True
+                    break
+                if cutoff is not None and created is not None and created < cutoff:
+                    reached = True
+                    break
+                # Actions shift down between pages while the market moves; keep the first copy.
+                batch.setdefault(key, action)
+
+            if reached or len(page) < self.limit:
+                reached = True
+                break
+            if not self._primed and cutoff is None:
+                reached = True
+                break
+
+        if not reached:
+            self.gaps += 1
+        self._primed = True
+
+        new = list(batch.items())
+        new.reverse()
+        for key, action in new:
+            self._seen[key] = None
+            created = action_time(action)
+            if created is not None and (self.newest is None or created > self.newest):
+                self.newest = created
+        while len(self._seen) > self.remember:
+            self._seen.popitem(last=False)
+
+        return [action for _, action in new]
@@ -0,0 +1,134 @@
+import time
+import asyncio
+from functools import wraps
+from curl_cffi.requests import AsyncSession
+from portalsmp import replay
+from portalsmp.metrics import observe_request
+from portalsmp.portalsapi import ENDPOINTS, HEADERS, APIRequest, PortalsAPIError, CloudflareChallenge, _prepare, _result
+
+class AsyncPortalsClient:
+    """
+    Asynchronous Portals API client.
+
+    Every endpoint from portalsapi (search, marketActivity, giftsFloors, buy, ...) is available as a
+    coroutine method with the same arguments and return value. All calls go through one curl_cffi
+    AsyncSession, so connections and TLS sessions are kept alive and reused, and concurrent calls
+    (e.g. via asyncio.gather) share a bounded connection pool instead of blocking the event loop.
+
+    Args:
+        authData (str): Default authData used when a method is called without one.
+        max_clients (int): Maximum number of concurrent connections in the pool. Defaults to 10.
+        timeout (float): Request timeout in seconds. Defaults to 30.
+        impersonate (str): Browser to impersonate. Defaults to "chrome110".
+        decoder (Callable | None): Response body decoder (bytes -> object). Defaults to portalsapi.json_loads.
+        challenge_solver (Callable | None): Coroutine function called with the client when a request gets a
+            Cloudflare challenge; the request is then retried once. Concurrent challenges share one solve.
+            Defaults to None (CloudflareChallenge is raised).
+        auth (AuthProvider | None): Source of authData used instead of `authData`; on a 401 answer the
+            token is refreshed and the request retried once. Defaults to None.
+
+    Attributes:
+        headers (dict): Headers sent with every request; Authorization is replaced per call.
+        cookies: Cookie jar of the underlying session (e.g. for Cloudflare clearance cookies).
+        challenges (int): Number of Cloudflare challenge responses received.
+        solves (int): Number of successful challenge_solver runs.
+        auth_retries (int): Number of requests retried after a 401 answer.
+
+    Example:
+        async with AsyncPortalsClient(authData) as client:
+            floors, actions = await asyncio.gather(client.giftsFloors(), client.marketActivity())
+    """
+    def __init__(self, authData: str = "", max_clients: int = 10, timeout: float = 30, impersonate: str = "chrome110", decoder=None, challenge_solver=None, auth=None):
+        self.authData = authData
+        self.decoder = decoder
+        self.challenge_solver = challenge_solver
+        self.auth = auth
+        self.headers = dict(HEADERS)
+        self.challenges = 0
+        self.solves = 0
+        self.auth_retries = 0
+        self._session = AsyncSession(impersonate=impersonate, timeout=timeout, max_clients=max_clients)
+        self._solving = None
+
+    @property
+    def cookies(self):
+        return self._session.cookies
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self._session.close()
+
+    async def send(self, request: APIRequest):
+        """
+        Executes a prepared APIRequest and returns the endpoint result.
+        """
+        try:
+            return await self._send_cleared(request)
+        except PortalsAPIError as e:
+            auth = self.auth
+            if e.status_code != 401 or auth is None or request.authData not in (auth.token, auth.previous):
+                raise
+            # Only the first request to see the stale token refreshes it; the others reuse the new one.
+            if request.authData == auth.token:
+                await auth.refresh()
+            self.auth_retries += 1
+            return await self._send_cleared(request._replace(authData=auth.token))
+
+    async def _send_cleared(self, request: APIRequest):
+        solves = self.solves
+        try:
+            return await self._send(request)
+        except CloudflareChallenge:
+            self.challenges += 1
+            if self.challenge_solver is None:
+                raise
+            # A solve that finished while this request was in flight already covers it.
+            if self.solves == solves:
+                await self._solve_challenge()
+            return await self._send(request)
+
+    async def _send(self, request: APIRequest):
+        headers = {**self.headers, "Authorization": request.authData}
+
+        tape = replay.current()
+        started = time.perf_counter()
+        try:
+            if tape is not None and tape.replaying:
+                response = await tape.arespond(request)
+            else:
+                response = await self._session.request(request.method, request.url, json=request.payload, headers=headers)
+        except Exception:
+            observe_request(request.name, "error", time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        observe_request(request.name, response.status_code, elapsed, len(response.content))
+        if tape is not None and not tape.replaying:
+            tape.record(request, response, elapsed)
+        return _result(request, response, self.decoder)
+
+    async def _solve_challenge(self):
+        if self._solving is None:
+            self._solving = asyncio.ensure_future(self._run_solver())
+        await asyncio.shield(self._solving)
+
+    async def _run_solver(self):
+        try:
+            await self.challenge_solver(self)
+            self.solves += 1
+        finally:
+            self._solving = None
+
+def _method(build):
+    @wraps(build)
+    async def method(self, *args, **kwargs):
+        authData = await self.auth.get() if self.auth is not None else self.authData
+        return await self.send(_prepare(build, authData, args, kwargs))
+    return method
+
+for _name, _build in ENDPOINTS.items():
+    setattr(AsyncPortalsClient, _name, _method(_build))
@@ -0,0 +1,118 @@
+import time
+import asyncio
+from urllib.parse import parse_qs
+from portalsmp.portalsapi import request_auth
+
+def auth_date(authData: str) -> float | None:
+    """
+    Returns the auth_date (UNIX time) signed into a "tma ..." authData string, or None if absent.
+    """
+    values = parse_qs(authData.removeprefix("tma ")).get("auth_date")
+    try:
+        return float(values[0]) if values else None
+    except ValueError:
+        return None
+
+class AuthProvider:
+    """
+    Cached Portals authData derived from an already connected Pyrogram client.
+
+    The "tma ..." token is requested once through the bot's existing MTProto connection (no new
+    Client is created) and cached together with its auth_date. A background task requests a new one
+    `margin` seconds before it reaches `lifetime`, so callers of get() never wait on Telegram except
+    for the very first token. AsyncPortalsClient(auth=provider) also refreshes it and retries once
+    when the API answers 401.
+
+    Args:
+        client (pyrogram.Client): A started Pyrogram user client.
+        lifetime (float): Seconds after auth_date the token is considered valid. Defaults to 3600.
+        margin (float): Seconds before expiry at which the token is refreshed. Defaults to 300.
+        retry (float): Seconds before retrying a failed background refresh. Defaults to 30.
+
+    Attributes:
+        token (str): Current authData ("" before the first refresh).
+        previous (str): The token replaced by the last refresh.
+        issued (float): auth_date of the current token.
+        refreshes (int): Number of tokens obtained.
+        last_error (Exception | None): Error of the last failed background refresh.
+    """
+    def __init__(self, client, lifetime: float = 3600, margin: float = 300, retry: float = 30):
+        self.client = client
+        self.lifetime = lifetime
+        self.margin = margin
+        self.retry = retry
+        self.token = ""
+        self.previous = ""
+        self.issued = 0.0
+        self.refreshes = 0
+        self.last_error = None
+        self._refreshing = None
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self):
+        """
+        Obtains the first token and starts the background refresh. A failed first request is kept in
+        last_error and retried by the background task (and by get()).
+        """
+        try:
+            await self.refresh()
+        except Exception as e:
+            self.last_error = e
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def expires(self) -> float:
+        return self.issued + self.lifetime
+
+    async def get(self) -> str:
+        """
+        Returns a valid authData, refreshing first only if the cached one has already expired.
+        """
+        if not self.token or time.time() >= self.expires:
+            await self.refresh()
+        return self.token
+
+    async def refresh(self) -> str:
+        """
+        Requests a new token. Concurrent calls share one request.
+        """
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._request())
+        return await asyncio.shield(self._refreshing)
+
+    async def _request(self) -> str:
+        try:
+            token = await request_auth(self.client)
+            self.previous, self.token = self.token, token
+            self.issued = auth_date(token) or time.time()
+            self.refreshes += 1
+            return token
+        finally:
+            self._refreshing = None
+
+    async def _run(self):
+        while True:
+            delay = self.expires - self.margin - time.time() if self.last_error is None else self.retry
+            await asyncio.sleep(max(delay, self.retry))
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
@@ -0,0 +1,194 @@
+import abc
+import time
+import asyncio
+from portalsmp.portalsapi import toShortName
+from portalsmp.collections_ids import collections_ids
+
+class _Refreshing(abc.ABC):
+    # Background refresh shared by the floor caches: refresh() once on start(), then every
+    # `ttl` seconds, retrying after `retry` seconds on failure while keeping the old data.
+    def __init__(self, ttl: float, retry: float):
+        self.ttl = ttl
+        self.retry = retry
+        self.updated = 0.0
+        self.last_error = None
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self):
+        """
+        Loads the data once and starts the background refresh. A failed first load is kept in last_error.
+        """
+        await self._try_refresh()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @abc.abstractmethod
+    async def refresh(self):
+        """
+        Reloads the data; raising keeps the previous data.
+        """
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.updated if self.updated else float("inf")
+
+    async def _try_refresh(self) -> bool:
+        try:
+            await self.refresh()
+        except Exception as e:
+            self.last_error = e
+            return False
+        self.last_error = None
+        self.updated = time.time()
+        return True
+
+    async def _run(self):
+        delay = self.ttl if self.last_error is None else self.retry
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.ttl if await self._try_refresh() else self.retry
+
+class FloorCache(_Refreshing):
+    """
+    Collection floor prices from giftsFloors(), cached and refreshed in the background.
+
+    One giftsFloors() request covers every collection; after start() the cache refreshes itself every
+    `ttl` seconds, and get() is a dictionary lookup, so checking a gift against its floor costs no request.
+    Gift names are resolved to the short names used by giftsFloors() through an index precomputed from
+    collections_ids (unknown names are converted once and memoized).
+
+    Args:
+        client (AsyncPortalsClient): Client used for giftsFloors requests.
+        ttl (float): Seconds between refreshes. Defaults to 300.
+        retry (float): Seconds before retrying a failed refresh. Defaults to 30.
+
+    Attributes:
+        floors (dict): Short name -> floor price.
+        updated (float): UNIX time of the last successful refresh (0 if none yet).
+        last_error (Exception | None): Error of the last failed refresh, None after a success.
+    """
+    def __init__(self, client, ttl: float = 300, retry: float = 30):
+        super().__init__(ttl, retry)
+        self.client = client
+        self.floors = {}
+        self._short_names = {name: toShortName(name) for name in collections_ids}
+
+    async def refresh(self):
+        self.load(await self.client.giftsFloors())
+
+    def load(self, data: dict | None):
+        """
+        Replaces the floors with a giftsFloors() result (short name -> price).
+        """
+        self.floors = {short_name: float(floor) for short_name, floor in (data or {}).items() if floor}
+
+    def short_name(self, gift_name: str) -> str:
+        short_name = self._short_names.get(gift_name)
+        if short_name is None:
+            short_name = self._short_names[gift_name] = toShortName(gift_name)
+        return short_name
+
+    def get(self, gift_name: str) -> float | None:
+        """
+        Returns the cached floor price of a collection by its gift name, or None if unknown.
+        """
+        return self.floors.get(self.short_name(gift_name))
+
+class AttributeFloorIndex(_Refreshing):
+    """
+    Model, backdrop and symbol floor prices of every collection, built from filterFloors().
+
+    refresh() requests filterFloors() for each collection in collections_ids concurrently (at most
+    `concurrency` requests at a time) and swaps in the new tables; a collection whose request fails keeps
+    its previous floors. After start() the index refreshes itself every `ttl` seconds and get() is an
+    O(1) lookup by (collection, attribute type, value), so "below model floor" checks cost no requests.
+
+    Args:
+        client (AsyncPortalsClient): Client used for filterFloors requests.
+        ttl (float): Seconds between refreshes. Defaults to 900.
+        retry (float): Seconds before retrying a refresh where every request failed. Defaults to 60.
+        concurrency (int): Maximum number of simultaneous filterFloors requests. Defaults to 4.
+        gift_names (list | None): Collections to index. Defaults to all of collections_ids.
+
+    Attributes:
+        failed (dict): Gift name -> error of collections whose last request failed.
+    """
+    KINDS = {"model": "models", "backdrop": "backdrops", "symbol": "symbols"}
+
+    def __init__(self, client, ttl: float = 900, retry: float = 60, concurrency: int = 4, gift_names: list | None = None):
+        super().__init__(ttl, retry)
+        self.client = client
+        self.concurrency = concurrency
+        self.gift_names = list(gift_names or collections_ids)
+        self.failed = {}
+        self._short_names = {name: toShortName(name) for name in self.gift_names}
+        self._tables = {}
+
+    async def refresh(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def load(gift_name):
+            async with semaphore:
+                return await self.client.filterFloors(gift_name)
+
+        results = await asyncio.gather(*(load(name) for name in self.gift_names), return_exceptions=True)
+
+        tables = dict(self._tables)
+        failed = {}
+        for gift_name, result in zip(self.gift_names, results):
+            if isinstance(result, Exception):
+                failed[gift_name] = result
+                continue
+            tables[self._short_names[gift_name]] = self.parse(result)
+
+        self._tables = tables
+        self.failed = failed
+        if failed and len(failed) == len(self.gift_names):
+            raise next(iter(failed.values()))
+
+    @classmethod
+    def parse(cls, result: dict | None) -> dict:
+        """
+        Converts a filterFloors() result into a lookup table {(kind, lowercased value): floor}.
+        """
+        table = {}
+        for kind, key in cls.KINDS.items():
+            for value, floor in ((result or {}).get(key) or {}).items():
+                if floor:
+                    table[(kind, value.lower())] = float(floor)
+        return table
+
+    def load(self, gift_name: str, result: dict | None):
+        """
+        Replaces the floors of one collection with a filterFloors() result obtained elsewhere (e.g. a recording).
+        """
+        self._tables = {**self._tables, toShortName(gift_name): self.parse(result)}
+
+    def get(self, gift_name: str, kind: str, value: str) -> float | None:
+        """
+        Returns the floor price for an attribute value of a collection, or None if unknown.
+
+        Args:
+            gift_name (str): Collection name, e.g. "Plush Pepe".
+            kind (str): "model", "backdrop" or "symbol".
+            value (str): Attribute value, e.g. "Cozy Galaxy".
+        """
+        short_name = self._short_names.get(gift_name) or toShortName(gift_name)
+        table = self._tables.get(short_name)
+        return table.get((kind, value.lower())) if table else None
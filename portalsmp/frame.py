@@ -0,0 +1,195 @@
+import numpy as np
+
+_CATEGORIES = ("collection", "model", "backdrop", "symbol")
+_RARITIES = {"model": "model_rarity", "symbol": "symbol_rarity", "backdrop": "backdrop_rarity"}
+
+class GiftFrame:
+    """
+    Columnar batch of gifts for vectorized filtering, sorting and ranking.
+
+    Built in one pass over search() results or marketActivity() actions (whose gift is in "nft" and
+    whose price is "amount"). Every column is a NumPy array of the same length:
+
+        price, floor (float64, NaN when unknown)
+        model_rarity, symbol_rarity, backdrop_rarity (float32 rarity per mille, NaN when unknown)
+        collection, model, backdrop, symbol (int32 codes into `categories`, -1 when unknown)
+
+    The floor is `floors.get(name)` when a FloorCache (or any object with get(gift_name)) is given and
+    knows the collection, else the gift's own floor_price. Operations return new frames that share the
+    categories and keep a reference to the source items, so results map back to the original dicts
+    with items().
+
+    Args:
+        items (list): Gifts or market actions.
+        floors (FloorCache | None): Source of collection floors. Defaults to None (use floor_price).
+        categories (dict | None): Existing {column: {value: code}} vocabularies to extend. Defaults to None.
+
+    Attributes:
+        categories (dict): {column: {value: code}} for collection, model, backdrop and symbol.
+        source (list): The items the frame was built from.
+        index (np.ndarray): Positions of the frame rows in `source`.
+
+    Example:
+        frame = GiftFrame.from_pages(iter_search(max_items=5000), floors=cache)
+        deals = frame.where(min_drop=15, max_price=50).top_k(10, "drop_percent")
+        for gift in deals.items():
+            ...
+    """
+    def __init__(self, items: list = (), floors=None, categories: dict | None = None):
+        self.categories = categories if categories is not None else {name: {} for name in _CATEGORIES}
+        self.source = items if isinstance(items, list) else list(items)
+        n = len(self.source)
+
+        # one pass over the items filling plain lists (one per column), converted to arrays at the end
+        nan = float("nan")
+        price, floor = [nan] * n, [nan] * n
+        model_rarity, symbol_rarity, backdrop_rarity = [nan] * n, [nan] * n, [nan] * n
+        collection, model, backdrop, symbol = [-1] * n, [-1] * n, [-1] * n, [-1] * n
+        collections, models, backdrops, symbols = (self.categories[name] for name in _CATEGORIES)
+
+        for i, item in enumerate(self.source):
+            nft = item.get("nft") or item
+            name = nft.get("name")
+            value = item.get("amount") or nft.get("price")
+            if value:
+                price[i] = float(value)
+            value = (floors.get(name) if floors is not None and name else None) or nft.get("floor_price")
+            if value:
+                floor[i] = float(value)
+            if name:
+                collection[i] = collections.setdefault(name, len(collections))
+            for attr in nft.get("attributes") or ():
+                kind = attr.get("type")
+                # a None rarity becomes NaN in the float32 arrays
+                if kind == "model":
+                    model[i] = models.setdefault(attr.get("value"), len(models))
+                    model_rarity[i] = attr.get("rarity_per_mille")
+                elif kind == "backdrop":
+                    backdrop[i] = backdrops.setdefault(attr.get("value"), len(backdrops))
+                    backdrop_rarity[i] = attr.get("rarity_per_mille")
+                elif kind == "symbol":
+                    symbol[i] = symbols.setdefault(attr.get("value"), len(symbols))
+                    symbol_rarity[i] = attr.get("rarity_per_mille")
+
+        self.price = np.array(price, dtype=np.float64)
+        self.floor = np.array(floor, dtype=np.float64)
+        self.model_rarity = np.array(model_rarity, dtype=np.float32)
+        self.symbol_rarity = np.array(symbol_rarity, dtype=np.float32)
+        self.backdrop_rarity = np.array(backdrop_rarity, dtype=np.float32)
+        self.collection = np.array(collection, dtype=np.int32)
+        self.model = np.array(model, dtype=np.int32)
+        self.backdrop = np.array(backdrop, dtype=np.int32)
+        self.symbol = np.array(symbol, dtype=np.int32)
+        self.index = np.arange(n)
+
+    @classmethod
+    def from_pages(cls, pages, floors=None) -> "GiftFrame":
+        """
+        Builds a frame from an iterable of result pages (lists), or of single items such as iter_search().
+        """
+        items = []
+        for page in pages:
+            if isinstance(page, list):
+                items.extend(page)
+            else:
+                items.append(page)
+        return cls(items, floors)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def drop_percent(self) -> np.ndarray:
+        """
+        Discount of the price versus the floor in percent (NaN where either is unknown).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drop = 100 * (1 - self.price / self.floor)
+        drop[~(self.floor > 0)] = np.nan
+        return drop
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Returns a column (or "drop_percent") by name.
+        """
+        if name == "drop_percent":
+            return self.drop_percent
+        if name not in ("price", "floor", "index") and name not in _RARITIES.values() and name not in _CATEGORIES:
+            raise KeyError(f"portalsmp: GiftFrame.column(): Error: unknown column {name!r}")
+        return getattr(self, name)
+
+    def codes(self, column: str, values) -> np.ndarray:
+        """
+        Returns the codes of `values` (a name or a list of names) in a categorical column; unknown names are skipped.
+        """
+        table = self.categories[column]
+        values = [values] if isinstance(values, str) else values
+        return np.array([table[value] for value in values if value in table], dtype=np.int32)
+
+    def take(self, rows) -> "GiftFrame":
+        """
+        Returns a frame with the given rows (a boolean mask or an array of positions).
+        """
+        frame = object.__new__(GiftFrame)
+        frame.categories = self.categories
+        frame.source = self.source
+        for name in ("price", "floor", "model_rarity", "symbol_rarity", "backdrop_rarity", "index") + _CATEGORIES:
+            setattr(frame, name, getattr(self, name)[rows])
+        return frame
+
+    def where(self, min_price: float | None = None, max_price: float | None = None, min_drop: float | None = None,
+              max_model_rarity: float | None = None, max_backdrop_rarity: float | None = None,
+              max_symbol_rarity: float | None = None, collection=None, model=None, backdrop=None, symbol=None) -> "GiftFrame":
+        """
+        Returns the rows matching every given condition. Name conditions accept one name or a list.
+        Rows with an unknown price, floor or rarity never match a condition on that column.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price <= max_price
+        if min_drop is not None:
+            mask &= self.drop_percent >= min_drop
+        for column, limit in (("model_rarity", max_model_rarity), ("backdrop_rarity", max_backdrop_rarity), ("symbol_rarity", max_symbol_rarity)):
+            if limit is not None:
+                mask &= getattr(self, column) <= limit
+        for column, values in (("collection", collection), ("model", model), ("backdrop", backdrop), ("symbol", symbol)):
+            if values is not None:
+                mask &= np.isin(getattr(self, column), self.codes(column, values))
+        return self.take(mask)
+
+    def sort(self, by: str, descending: bool = False) -> "GiftFrame":
+        """
+        Returns the frame sorted by a column; NaN values go last.
+        """
+        values = self.column(by)
+        order = np.argsort(-values if descending else values, kind="stable")
+        return self.take(order)
+
+    def top_k(self, k: int, by: str, largest: bool = True) -> "GiftFrame":
+        """
+        Returns the k rows with the largest (or smallest) values of a column, in order, without a full sort.
+        """
+        keys = -self.column(by) if largest else self.column(by)
+        keys = np.where(np.isnan(keys), np.inf, keys)
+        if k < len(keys):
+            part = np.argpartition(keys, k)[:k]
+            order = part[np.argsort(keys[part], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+        return self.take(order)
+
+    def items(self) -> list:
+        """
+        Returns the source items of the frame rows, in frame order.
+        """
+        source = self.source
+        return [source[i] for i in self.index.tolist()]
+
+    def names(self, column: str) -> list:
+        """
+        Decodes a categorical column back to names (None where unknown).
+        """
+        lookup = {code: name for name, code in self.categories[column].items()}
+        return [lookup.get(code) for code in getattr(self, column).tolist()]
@@ -0,0 +1,201 @@
+import math
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: tuple) -> tuple:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"portalsmp: {self.name}: Error: expected labels {self.labels}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def render(self) -> list:
+        help = self.help.replace("\\", "\\\\").replace("\n", "\\n")
+        lines = [f"# HELP {self.name} {help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list:
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    """
+    Monotonic counter, optionally split by label values.
+    """
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down. With `fn`, the value is read at render time instead: fn() returns
+    a number, or {label values tuple: number} for a labelled gauge.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), fn=None):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def set(self, value: float, *labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> list:
+        if self.fn is not None:
+            values = self.fn()
+            values = values if isinstance(values, dict) else {(): values}
+            with self._lock:
+                self._values = {self._key(key if isinstance(key, tuple) else (key,)): value for key, value in values.items()}
+        return super().render()
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets (plus their sum and count).
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, key: tuple, value) -> list:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+class Registry:
+    """
+    A named set of metrics rendered together in the Prometheus text format.
+
+    counter(), gauge() and histogram() return the existing metric when the name is already registered,
+    so modules can declare the metrics they update without coordinating.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"portalsmp: Registry: Error: {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: tuple = (), fn=None) -> Gauge:
+        gauge = self._get(Gauge, name, help, labels)
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("portals_requests_total", "Portals API requests by endpoint and HTTP status (\"error\" when no response).", ("endpoint", "status"))
+LATENCY = REGISTRY.histogram("portals_request_seconds", "Portals API request latency in seconds.", ("endpoint",))
+RESPONSE_BYTES = REGISTRY.histogram("portals_response_bytes", "Portals API response body size in bytes.", ("endpoint",), buckets=SIZE_BUCKETS)
+
+def observe_request(endpoint: str, status, seconds: float, size: int | None = None):
+    """
+    Records one Portals API request. Called by PortalsSession and AsyncPortalsClient for every request.
+    """
+    REQUESTS.inc(endpoint, status)
+    LATENCY.observe(seconds, endpoint)
+    if size is not None:
+        RESPONSE_BYTES.observe(size, endpoint)
+
+def serve(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serves registry.render() at http://host:port/metrics from a daemon thread. Returns the server;
+    call shutdown() on it to stop.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="portalsmp-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from portalsmp.portalsapi import search
+
+PREFETCH_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _prefetcher() -> ThreadPoolExecutor:
+    # One pool for every iter_search call: its threads live as long as the process, so the pages
+    # they fetch keep reusing the same pooled connections.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="portalsmp-prefetch")
+    return _executor
+
+class _Pager:
+    # Shared bookkeeping of iter_search/aiter_search: which offsets to request next,
+    # item budget and de-duplication of items that shift between pages.
+    def __init__(self, offset: int, limit: int, max_items: int | None):
+        self.start = offset
+        self.next_offset = offset
+        self.limit = limit
+        self.max_items = max_items
+        self.exhausted = False
+        self.yielded = 0
+        self.skipped = 0
+        self.seen = set()
+
+    def wants_page(self) -> bool:
+        if self.exhausted:
+            return False
+        if self.max_items is None:
+            return True
+        return self.next_offset - self.start < self.max_items + self.skipped
+
+    def take_offset(self) -> int:
+        offset = self.next_offset
+        self.next_offset += self.limit
+        return offset
+
+    def items(self, page) -> list:
+        if not isinstance(page, list):
+            # search() returns the raw response body instead of a list when there are no results
+            page = []
+        if len(page) < self.limit:
+            self.exhausted = True
+
+        fresh = []
+        for item in page:
+            key = item.get("id")
+            if key in self.seen:
+                self.skipped += 1
+                continue
+            self.seen.add(key)
+            fresh.append(item)
+            self.yielded += 1
+            if self.max_items is not None and self.yielded >= self.max_items:
+                self.exhausted = True
+                break
+        return fresh
+
+def iter_search(prefetch: int = 2, max_items: int | None = None, offset: int = 0, limit: int = 20, session=None, **filters):
+    """
+    Iterates over all search() results, transparently paginating.
+
+    While the caller processes one page, the next `prefetch` pages are already being fetched by a
+    shared pool of PREFETCH_WORKERS threads. Items that appear twice because the market moved between page requests are skipped.
+
+    Args:
+        prefetch (int): Number of pages fetched ahead of the consumer. Defaults to 2.
+        max_items (int | None): Stop after yielding this many items. Defaults to None (all results).
+        offset (int): Starting offset. Defaults to 0.
+        limit (int): Page size. Defaults to 20.
+        session (PortalsSession | None): Session used for requests. Defaults to the module-level search().
+        **filters: Other search() arguments (sort, gift_name, model, backdrop, symbol, min_price, max_price, authData).
+
+    Yields:
+        dict: Search results, in page order.
+    """
+    fetch = session.search if session is not None else search
+    pager = _Pager(offset, limit, max_items)
+    pending = deque()
+    executor = _prefetcher()
+    try:
+        while True:
+            while pager.wants_page() and len(pending) <= prefetch:
+                pending.append(executor.submit(fetch, offset=pager.take_offset(), limit=limit, **filters))
+            if not pending:
+                return
+            for item in pager.items(pending.popleft().result()):
+                yield item
+            if pager.exhausted:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+
+async def aiter_search(client, prefetch: int = 2, max_items: int | None = None, offset: int = 0, limit: int = 20, **filters):
+    """
+    Asynchronously iterates over all search() results of an AsyncPortalsClient, transparently paginating.
+
+    While the caller processes one page, the next `prefetch` pages are already being fetched concurrently.
+    Items that appear twice because the market moved between page requests are skipped.
+
+    Args:
+        client (AsyncPortalsClient): Client used for requests.
+        prefetch (int): Number of pages fetched ahead of the consumer. Defaults to 2.
+        max_items (int | None): Stop after yielding this many items. Defaults to None (all results).
+        offset (int): Starting offset. Defaults to 0.
+        limit (int): Page size. Defaults to 20.
+        **filters: Other search() arguments (sort, gift_name, model, backdrop, symbol, min_price, max_price, authData).
+
+    Yields:
+        dict: Search results, in page order.
+    """
+    pager = _Pager(offset, limit, max_items)
+    pending = deque()
+    try:
+        while True:
+            while pager.wants_page() and len(pending) <= prefetch:
+                pending.append(asyncio.ensure_future(client.search(offset=pager.take_offset(), limit=limit, **filters)))
+            if not pending:
+                return
+            for item in pager.items(await pending.popleft()):
+                yield item
+            if pager.exhausted:
+                return
+    finally:
+        for task in pending:
+            task.cancel()
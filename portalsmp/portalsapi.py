@@ -1,13 +1,23 @@
 import asyncio
+import inspect
+import json
+import sys
+from functools import wraps
+from operator import itemgetter
+from typing import Any, Callable, NamedTuple
 from urllib.parse import unquote, quote_plus
 from pyrogram import Client
 from pyrogram.raw.functions.messages import RequestAppWebView
 from pyrogram.raw.types import InputBotAppShortName, InputUser
 from pyrogram.raw.functions.users import GetUsers
-from curl_cffi import requests
 import re
 from portalsmp.collections_ids import collections_ids
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def cap(text) -> str:
     words = re.findall(r"\w+(?:'\w+)?", text)
     for word in words:
@@ -38,20 +48,32 @@ async def update_auth(api_id: int|str, api_hash: str, session_string: str | None
         str: new authData
     """
     async with Client("account", api_id=api_id, api_hash=api_hash, session_string=session_string) as client:
-        peer = await client.resolve_peer("portals")
-        user_full = await client.invoke(GetUsers(id=[peer]))
-        bot_raw = user_full[0]
-        bot = InputUser(user_id=bot_raw.id, access_hash=bot_raw.access_hash)
-        bot_app = InputBotAppShortName(bot_id=bot, short_name="market")
-        web_view = await client.invoke(
-            RequestAppWebView(
-                peer=peer,
-                app=bot_app,
-                platform="desktop",
-            )
+        return await request_auth(client)
+
+async def request_auth(client: Client) -> str:
+    """
+    Requests Telegram authData for Portals API through an already connected Pyrogram client.
+
+    Args:
+        client (Client): A started Pyrogram user client.
+
+    Returns:
+        str: new authData
+    """
+    peer = await client.resolve_peer("portals")
+    user_full = await client.invoke(GetUsers(id=[peer]))
+    bot_raw = user_full[0]
+    bot = InputUser(user_id=bot_raw.id, access_hash=bot_raw.access_hash)
+    bot_app = InputBotAppShortName(bot_id=bot, short_name="market")
+    web_view = await client.invoke(
+        RequestAppWebView(
+            peer=peer,
+            app=bot_app,
+            platform="desktop",
         )
-        initData = unquote(web_view.url.split('tgWebAppData=', 1)[1].split('&tgWebAppVersion', 1)[0])
-        return f"tma {initData}"
+    )
+    initData = unquote(web_view.url.split('tgWebAppData=', 1)[1].split('&tgWebAppVersion', 1)[0])
+    return f"tma {initData}"
 
 SORTS = {
     "latest": "&sort_by=listed_at+desc",
@@ -75,6 +97,99 @@ HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36 Edg/137.0.0.0"
     }
 
+class APIRequest(NamedTuple):
+    """
+    A prepared Portals API request, built by an endpoint function and executed by a client.
+
+    Attributes:
+        name (str): Endpoint name used in error messages.
+        method (str): HTTP method.
+        url (str): Full request URL.
+        authData (str): The authentication data sent in the Authorization header.
+        payload (dict | None): JSON body for POST/PATCH requests.
+        ok (tuple): Status codes treated as success.
+        result (Callable | None): Extracts the return value from the decoded JSON body.
+    """
+    name: str
+    method: str
+    url: str
+    authData: str
+    payload: dict | None = None
+    ok: tuple = (200,)
+    result: Callable[[Any], Any] | None = None
+
+class PortalsAPIError(Exception):
+    """
+    Raised when the Portals API answers with an unexpected status code.
+
+    Attributes:
+        status_code (int): HTTP status code of the response.
+        text (str): Response body.
+    """
+    def __init__(self, message: str, status_code: int, text: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.text = text
+
+class CloudflareChallenge(PortalsAPIError):
+    """
+    Raised when the response is a Cloudflare challenge page instead of an API answer.
+    """
+
+CHALLENGE_MARKERS = ("cf-chl", "challenge-platform", "cf_chl_opt", "Just a moment...", "Attention Required! | Cloudflare")
+
+def is_challenge(response) -> bool:
+    if response.status_code not in (403, 503):
+        return False
+    if (response.headers.get("cf-mitigated") or "").lower() == "challenge":
+        return True
+    text = response.text
+    return any(marker in text for marker in CHALLENGE_MARKERS)
+
+# Decoder for response bodies (bytes -> object). orjson is several times faster on large
+# search/activity pages; clients take their own decoder, defaulting to this one.
+json_loads = orjson.loads if orjson else json.loads
+
+ENDPOINTS = {}
+_AUTH_INDEX = {}
+
+def endpoint(build):
+    """
+    Registers a request builder as a Portals API endpoint.
+
+    The decorated name becomes the blocking function (same arguments, returns the API result)
+    executed on the default PortalsSession, and the builder itself is kept
+    in ENDPOINTS so PortalsSession and AsyncPortalsClient can expose the same endpoint as a method.
+    """
+    ENDPOINTS[build.__name__] = build
+    _AUTH_INDEX[build.__name__] = list(inspect.signature(build).parameters).index("authData")
+
+    @wraps(build)
+    def call(*args, **kwargs):
+        return _send(build(*args, **kwargs))
+    return call
+
+def _prepare(build, authData: str, args: tuple, kwargs: dict) -> APIRequest:
+    if len(args) <= _AUTH_INDEX[build.__name__] and "authData" not in kwargs:
+        kwargs["authData"] = authData
+    return build(*args, **kwargs)
+
+def _send(request: APIRequest):
+    # portalsmp.session imports this module, so the default session is resolved at call time.
+    from portalsmp.session import default_session
+    return default_session().send(request)
+
+def _result(request: APIRequest, response, decoder=None):
+    if response.status_code not in request.ok:
+        error = CloudflareChallenge if is_challenge(response) else PortalsAPIError
+        raise error(f"portalsmp: {request.name}(): Error: status_code: {response.status_code}, response_text: {response.text}", response.status_code, response.text)
+    if response.status_code == 204:
+        return None
+
+    data = (decoder or json_loads)(response.content)
+    return request.result(data) if request.result else data
+
+@endpoint
 def search(sort: str = "price_asc", offset: int = 0, limit: int = 20, gift_name: str | list = "", model: str | list = "", backdrop: str | list = "", symbol: str | list = "", min_price: int = 0, max_price: int = 100000, authData: str = "") -> list:
     """
     Search for gifts with various filters and sorting options.
@@ -151,14 +266,9 @@ def search(sort: str = "price_asc", offset: int = 0, limit: int = 20, gift_name:
     
     URL += "&status=listed"
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: search(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()["results"] if response.json()["results"] else response.json()
+    return APIRequest("search", "GET", URL, authData, result=lambda data: data["results"] if data["results"] else data)
 
+@endpoint
 def giftsFloors(authData: str = "") -> dict:
     """
     Retrieves the floor prices for all gift collections (short names only).
@@ -179,14 +289,9 @@ def giftsFloors(authData: str = "") -> dict:
     if authData == "":
         raise Exception("portalsmp: giftsFloors(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: giftsFloors(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()['floorPrices'] if response.json()['floorPrices'] else None
+    return APIRequest("giftsFloors", "GET", URL, authData, result=lambda data: data['floorPrices'] if data['floorPrices'] else None)
 
+@endpoint
 def myPortalsGifts(offset: int = 0, limit: int = 20, listed: bool = True, authData: str = "") -> list:
     """
     Retrieves a list of the user's owned Portal gifts.
@@ -212,15 +317,10 @@ def myPortalsGifts(offset: int = 0, limit: int = 20, listed: bool = True, authDa
         URL += "&status=listed"
     else:
         URL += "&status=unlisted"
-    
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myPortalsGifts(): Error: status_code: {response.status_code}, response_text: {response.text}")
 
-    return response.json()['nfts'] if 'nfts' in response.json() else response.json()
+    return APIRequest("myPortalsGifts", "GET", URL, authData, result=lambda data: data['nfts'] if 'nfts' in data else data)
 
+@endpoint
 def myPoints(authData: str = "") -> dict:
     """
     Retrieves the user's Portals Points information.
@@ -240,14 +340,9 @@ def myPoints(authData: str = "") -> dict:
     if authData == "":
         raise Exception("portalsmp: myPoints(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myPoints(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("myPoints", "GET", URL, authData)
 
+@endpoint
 def myBalances(authData: str = "") -> dict:
     """
     Retrieves the user's balances.
@@ -267,14 +362,9 @@ def myBalances(authData: str = "") -> dict:
     if authData == "":
         raise Exception("portalsmp: myBalances(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myBalances(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("myBalances", "GET", URL, authData)
 
+@endpoint
 def myActivity(offset: int = 0, limit: int = 20, authData: str = "") -> list:
     """
     Retrieves the user's activity on the marketplace.
@@ -296,14 +386,9 @@ def myActivity(offset: int = 0, limit: int = 20, authData: str = "") -> list:
     if authData == "":
         raise Exception("portalsmp: myActivity(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myActivity(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()['actions'] if response.json()['actions'] else response.json()
+    return APIRequest("myActivity", "GET", URL, authData, result=lambda data: data['actions'] if data['actions'] else data)
 
+@endpoint
 def collections(limit: int = 100, authData: str = "") -> list:
     """
     Retrieves a list of collections and their floors, supply, daily volume etc from the marketplace.
@@ -324,14 +409,9 @@ def collections(limit: int = 100, authData: str = "") -> list:
     if authData == "":
         raise Exception("portalsmp: collections(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: collections(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()['collections'] if response.json()['collections'] else response.json()
+    return APIRequest("collections", "GET", URL, authData, result=lambda data: data['collections'] if data['collections'] else data)
 
+@endpoint
 def marketActivity(sort: str = "latest", offset: int = 0, limit: int = 20, activityType: str | list = "", gift_name: str | list= "", model: str | list = "", backdrop: str | list = "", symbol: str | list = "", min_price: int = 0, max_price: int = 100000, authData: str = "") -> list:
     """
     Retrieves market activity with various filters and sorting options.
@@ -413,12 +493,7 @@ def marketActivity(sort: str = "latest", offset: int = 0, limit: int = 20, activ
     if activityType:
         URL += f"&action_types={activityType}"
 
-    HEADERS["Authorization"] = authData
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: marketActivity(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()['actions'] if 'actions' in response.json() else response.json()
+    return APIRequest("marketActivity", "GET", URL, authData, result=lambda data: data['actions'] if 'actions' in data else data)
 
 def convertForListing(nft_id: str = "", price: float = 0):
     return {"nft_id": nft_id, "price": str(price)}
@@ -426,6 +501,7 @@ def convertForListing(nft_id: str = "", price: float = 0):
 def convertForBuying(nft_id: str = "", price: float = 0):
     return {"id": nft_id, "price": str(price)}
 
+@endpoint
 def bulkList(nfts: list = [], authData: str = "") -> dict:
     """
     Lists multiple NFTs for sale in bulk.
@@ -450,18 +526,13 @@ def bulkList(nfts: list = [], authData: str = "") -> dict:
     if type(nfts) != list or len(nfts) == 0:
         raise Exception("portalsmp: bulkList(): Error: nfts must be a non-empty list")
 
-    HEADERS["Authorization"] = authData
-
     PAYLOAD = {
         "nft_prices": nfts
     }
 
-    response = requests.post(URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: bulkList(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("bulkList", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def sale(nft_id: str = "", price: int|float = 0,authData: str = "") -> dict | None:
     """
     Lists a single NFT for sale.
@@ -493,18 +564,13 @@ def sale(nft_id: str = "", price: int|float = 0,authData: str = "") -> dict | No
 
     nfts = [{"nft_id": nft_id, "price": str(price)}]
 
-    HEADERS["Authorization"] = authData
-
     PAYLOAD = {
         "nft_prices": nfts
     }
 
-    response = requests.post(URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: sale(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("sale", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def buy(nft_id: str = "", price: int|float = 0, authData: str = "") -> dict | None:
     """
     Buys a gift with the given nft_id at the given price.
@@ -533,8 +599,6 @@ def buy(nft_id: str = "", price: int|float = 0, authData: str = "") -> dict | No
     if price == 0 or type(price) not in [int, float]:
         raise Exception("portalsmp: buy(): Error: price error")
 
-    HEADERS["Authorization"] = authData
-
     nfts = [{"id": nft_id, "price": str(price)}]
     '''
     {"nft_details":[{"id":"aaaa8eb4-deac-4ba2-aa5c-ea79c73f0d5b","owner_id":6540727795,"price":"1.85"}]}
@@ -544,12 +608,9 @@ def buy(nft_id: str = "", price: int|float = 0, authData: str = "") -> dict | No
         "nft_details": nfts
     }
 
-    response = requests.post(URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: buy(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("buy", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def makeOffer(nft_id: str = "", offer_price: float = 0, expiration_days: int = 7, authData: str = "") -> dict | None:
     """
     Creates an offer for a specified NFT.
@@ -583,8 +644,6 @@ def makeOffer(nft_id: str = "", offer_price: float = 0, expiration_days: int = 7
     if authData == "":
         raise Exception("portalsmp: makeOffer(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
     PAYLOAD = {
         "offer": {
             "nft_id": nft_id,
@@ -594,13 +653,10 @@ def makeOffer(nft_id: str = "", offer_price: float = 0, expiration_days: int = 7
 
     if expiration_days == 7:
         PAYLOAD["offer"].update({"expiration_days": expiration_days})
-    
-    response = requests.post(URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: makeOffer(): Error: status_code: {response.status_code}, response_text: {response.content}")
 
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("makeOffer", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def cancelOffer(offer_id: str = "", authData: str = "") -> dict | None:
     """
     Cancels an offer with the given offer_id.
@@ -625,14 +681,9 @@ def cancelOffer(offer_id: str = "", authData: str = "") -> dict | None:
     if authData == "":
         raise Exception("portalsmp: cancelOffer(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.post(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: cancelOffer(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("cancelOffer", "POST", URL, authData, ok=(200, 204))
 
+@endpoint
 def changePrice(nft_id: str = "", price: float = 0, authData: str = "") -> dict | None:
     """
     Updates the price of a specified NFT.
@@ -662,27 +713,34 @@ def changePrice(nft_id: str = "", price: float = 0, authData: str = "") -> dict
     if authData == "":
         raise Exception("portalsmp: changePrice(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
     PAYLOAD = {
         "price": str(price)
     }
 
-    response = requests.post(URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: changePrice(): Error: status_code: {response.status_code}, response_text: {response.text}")
+    return APIRequest("changePrice", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
-    return response.json() if response.status_code == 200 else None
+_GIFT_FIELDS = ("id", "tg_id", "collection_id", "external_collection_number", "name", "photo_url", "price", "attributes",
+                "listed_at", "status", "animation_url", "emoji_id", "floor_price", "unlocks_at")
+_GIFT_KEYS = frozenset(_GIFT_FIELDS)
+_gift_fields = itemgetter(*_GIFT_FIELDS)
 
 class PortalsGift:
     """
+    A gift from search results (or the "nft" of a market action).
+
+    The gift keeps its fields in slots instead of the API dict: price and floor_price are parsed to
+    float once at construction, the collection name, collection ID and status are interned (they
+    repeat across a result page), and the model, symbol and backdrop are parsed out of "attributes"
+    on the first read of any of them and cached. toDict() rebuilds an API dict equal to the one the
+    gift was made from, including keys the class does not know.
+
     Attributes:
         id (str): Portals ID of the gift
         tg_id (int): Telegram ID of the gift
         collection_id (str): Portals ID of the gift collection
         name (str): Name of the gift
         photo_url (str): Photo URL of the gift (model + bg + symbol preview)
-        price (str): Price of the gift
+        price (float | None): Price of the gift
         model (str): Model of the gift
         model_rarity (float): Model rarity of the gift
         symbol (str): Symbol of the gift
@@ -693,105 +751,103 @@ class PortalsGift:
         status (str): (usually listed)
         animation_url (str): Lottie animation URL of the gift
         emoji_id (str): Telegram custom emoji ID of the gift
-        floor_price (str): Floor price of the gift (not the model)
+        floor_price (float | None): Floor price of the gift (not the model)
         unlocks_at (str): Time of when the gift will be available to be minted
     """
+    __slots__ = ("id", "tg_id", "collection_id", "name", "photo_url", "price", "listed_at", "status", "animation_url",
+                 "emoji_id", "floor_price", "unlocks_at", "_slug", "_price", "_floor_price", "_attributes", "_traits", "_extra")
+
     def __init__(self, data: dict):
-        self.__dict__ = data
-    
-    def toDict(self):
-        return self.__dict__
-    
-    @property
-    def id(self):
-        return self.__dict__["id"]
-    
-    @property
-    def tg_id(self):
-        return self.__dict__["external_collection_number"]
-    
-    @property
-    def collection_id(self):
-        return self.__dict__["collection_id"]
-    
-    @property
-    def name(self):
-        return self.__dict__["name"]
-    
-    @property
-    def photo_url(self):
-        return self.__dict__["photo_url"]
-    
-    @property
-    def price(self):
-        return float(self.__dict__["price"]) if self.__dict__["price"] else None
-    
+        try:
+            # exactly the API keys: 14 entries, all of them found
+            values = _gift_fields(data) if len(data) == len(_GIFT_FIELDS) else None
+        except KeyError:
+            values = None
+        if values is not None:
+            extra = None
+        else:
+            # (unknown keys, known keys missing from data), for toDict()
+            extra = ({key: value for key, value in data.items() if key not in _GIFT_KEYS}, _GIFT_KEYS.difference(data))
+            values = tuple(map(data.get, _GIFT_FIELDS))
+        (self.id, self._slug, collection_id, self.tg_id, name, self.photo_url, price, self._attributes,
+         self.listed_at, status, self.animation_url, self.emoji_id, floor_price, self.unlocks_at) = values
+        self.collection_id = sys.intern(collection_id) if type(collection_id) is str else collection_id
+        self.name = sys.intern(name) if type(name) is str else name
+        self.status = sys.intern(status) if type(status) is str else status
+        self._price = price
+        self.price = float(price) if price else None
+        self._floor_price = floor_price
+        self.floor_price = float(floor_price) if floor_price else None
+        self._traits = None
+        self._extra = extra
+
+    @classmethod
+    def from_list(cls, items: list | dict) -> list:
+        """
+        Wraps a whole result page: a list of gifts, or a response body holding them under "results" or "nfts".
+        """
+        if isinstance(items, dict):
+            items = items.get("results") or items.get("nfts") or []
+        return list(map(cls, items))
+
+    def toDict(self) -> dict:
+        data = {
+            "id": self.id,
+            "tg_id": self._slug,
+            "collection_id": self.collection_id,
+            "external_collection_number": self.tg_id,
+            "name": self.name,
+            "photo_url": self.photo_url,
+            "price": self._price,
+            "attributes": self._attributes,
+            "listed_at": self.listed_at,
+            "status": self.status,
+            "animation_url": self.animation_url,
+            "emoji_id": self.emoji_id,
+            "floor_price": self._floor_price,
+            "unlocks_at": self.unlocks_at,
+        }
+        if self._extra is not None:
+            extra, missing = self._extra
+            for key in missing:
+                del data[key]
+            data.update(extra)
+        return data
+
+    def _parsed(self) -> tuple:
+        # (model, model_rarity, symbol, symbol_rarity, backdrop, backdrop_rarity), one scan of attributes.
+        found = {}
+        for attr in self._attributes or ():
+            found.setdefault(attr["type"], (attr["value"], attr["rarity_per_mille"]))
+        model, symbol, backdrop = (found.get(kind, (None, None)) for kind in ("model", "symbol", "backdrop"))
+        self._traits = traits = (*model, *symbol, *backdrop)
+        return traits
+
     @property
     def model(self):
-        for attr in self.__dict__["attributes"]:
-            if attr["type"] == "model":
-                return attr["value"]
-        return None
+        return (self._traits or self._parsed())[0]
     
     @property
     def model_rarity(self):
-        for attr in self.__dict__["attributes"]:
-            if attr["type"] == "model":
-                return attr["rarity_per_mille"]
-        return None
+        return (self._traits or self._parsed())[1]
     
     @property
     def symbol(self):
-        for attr in self.__dict__["attributes"]:
-            if attr["type"] == "symbol":
-                return attr["value"]
-        return None
+        return (self._traits or self._parsed())[2]
     
     @property
     def symbol_rarity(self):
-        for attr in self.__dict__["attributes"]:
-            if attr["type"] == "symbol":
-                return attr["rarity_per_mille"]
-        return None
+        return (self._traits or self._parsed())[3]
     
     @property
     def backdrop(self):
-        for attr in self.__dict__["attributes"]:
-            if attr["type"] == "backdrop":
-                return attr["value"]
-        return None
+        return (self._traits or self._parsed())[4]
     
     @property
     def backdrop_rarity(self):
-        for attr in self.__dict__["attributes"]:
-            if attr["type"] == "backdrop":
-                return attr["rarity_per_mille"]
-        return None
-    
-    @property
-    def listed_at(self):
-        return self.__dict__["listed_at"]
-    
-    @property
-    def status(self):
-        return self.__dict__["status"]
-    
-    @property
-    def animation_url(self):
-        return self.__dict__["animation_url"]
-    
-    @property
-    def emoji_id(self):
-        return self.__dict__["emoji_id"]
-    
-    @property
-    def floor_price(self):
-        return float(self.__dict__["floor_price"]) if self.__dict__["floor_price"] else None
-    
-    @property
-    def unlocks_at(self):
-        return self.__dict__["unlocks_at"]
+        return (self._traits or self._parsed())[5]
     
+@endpoint
 def withdrawPortals(amount: float = 0, wallet: str = "", authData: str = "") -> dict:
     """
     Withdraw Portals from the user's wallet to an external address.
@@ -818,20 +874,15 @@ def withdrawPortals(amount: float = 0, wallet: str = "", authData: str = "") ->
         raise Exception("portalsmp: withdrawPortals(): Error: wallet is required")
     if not authData:
         raise Exception("portalsmp: withdrawPortals(): Error: authData is required")
-    
-    HEADERS["Authorization"] = authData
 
     PAYLOAD = {
         "amount": str(amount),
         "external_address": wallet
         }
-    
-    response = requests.post(URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: withdrawPortals(): Error: status_code: {response.status_code}, response_text: {response.text}")
 
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("withdrawPortals", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def collectionOffer(gift_name: str = "", amount: float | int = 0, expiration_days: int = 7, max_nfts: int = 1, authData: str = ""):
     """
     Make an offer for collection.
@@ -879,8 +930,6 @@ def collectionOffer(gift_name: str = "", amount: float | int = 0, expiration_day
     except:
         raise Exception("portalsmp: collectionOffer(): Error: gift_name is invalid")
 
-    HEADERS["Authorization"] = authData
-
     PAYLOAD = {
         "amount": str(amount),
         "collection_id": ID,
@@ -888,13 +937,9 @@ def collectionOffer(gift_name: str = "", amount: float | int = 0, expiration_day
         "max_nfts": max_nfts
     }
 
-    response = requests.post(url=URL, headers=HEADERS, json=PAYLOAD, impersonate="chrome110")
-
-    if response.status_code not in [200,201,204]:
-        raise Exception(f"portalsmp: collectionOffer(): Error: status_code: {response.status_code}, response_text: {response.text}")
-    
-    return response.json() if response.status_code in [200, 201] else None
+    return APIRequest("collectionOffer", "POST", URL, authData, PAYLOAD, ok=(200, 201, 204))
 
+@endpoint
 def cancelCollectionOffer(offer_id: str = "", authData: str = ""):
     URL = API_URL + "collection-offers/cancel"
 
@@ -903,20 +948,14 @@ def cancelCollectionOffer(offer_id: str = "", authData: str = ""):
 
     if not authData:
         raise Exception("portalsmp: cancelCollectionOffer(): Error: authData is required")
-    
-    HEADERS["Authorization"] = authData
 
     PAYLOAD = {
         "id": offer_id
     }
 
-    response = requests.post(url=URL, headers=HEADERS, json=PAYLOAD, impersonate="chrome110")
-
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: cancelCollectionOffer(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("cancelCollectionOffer", "POST", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def allCollectionOffers(gift_name: str = "", authData: str = "") -> list:
     """
     Retrieves all collection offers for a specific gift collection.
@@ -943,12 +982,9 @@ def allCollectionOffers(gift_name: str = "", authData: str = "") -> list:
         raise Exception("portalsmp: allCollectionOffers(): Error: authData is required")
     
     URL += f"{ID}/all"
-    HEADERS["Authorization"] = authData
-    response = requests.get(url=URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: allCollectionOffers(): Error: status_code: {response.status_code}, response_text: {response.text}")
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("allCollectionOffers", "GET", URL, authData)
 
+@endpoint
 def filterFloors(gift_name: str = "", authData: str = "") -> dict:
     """
     Retrieves the floor prices of models/backdrops/symbols for a specific gift collection.
@@ -965,21 +1001,18 @@ def filterFloors(gift_name: str = "", authData: str = "") -> dict:
     URL = API_URL + "collections/filters"
 
     if not authData:
-        raise Exception("portalsmp: filters(): Error: authData is required")
+        raise Exception("portalsmp: filterFloors(): Error: authData is required")
     if not gift_name:
-        raise Exception("portalsmp: filters(): Error: gift_name is required")
+        raise Exception("portalsmp: filterFloors(): Error: gift_name is required")
     if type(gift_name) == str:
         gift_name = toShortName(gift_name)
     if type(gift_name) != str:
-        raise Exception("portalsmp: filters(): Error: gift_name must be a string")
+        raise Exception("portalsmp: filterFloors(): Error: gift_name must be a string")
 
     URL += f"?short_names={gift_name}"
-    HEADERS["Authorization"] = authData
-    response = requests.get(url=URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: filters(): Error: status_code: {response.status_code}, response_text: {response.text}")
-    return response.json()['floor_prices'][gift_name] if response.status_code == 200 else None
+    return APIRequest("filterFloors", "GET", URL, authData, result=lambda data: data['floor_prices'][gift_name])
 
+@endpoint
 def myPlacedOffers(offset: int = 0, limit: int = 20, authData: str = ""):
     """
     Retrieves the offers placed by the user.
@@ -1001,14 +1034,9 @@ def myPlacedOffers(offset: int = 0, limit: int = 20, authData: str = ""):
     if authData == "":
         raise Exception("portalsmp: myPlacedOffers(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myPlacedOffers(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()['offers'] if 'offers' in response.json() else response.json()
+    return APIRequest("myPlacedOffers", "GET", URL, authData, result=lambda data: data['offers'] if 'offers' in data else data)
 
+@endpoint
 def editOffer(offer_id: str = "", new_price: float = 0, authData: str = "") -> None:
     """
     Edit existing offer price.
@@ -1037,12 +1065,9 @@ def editOffer(offer_id: str = "", new_price: float = 0, authData: str = "") -> N
         "amount": str(float(new_price))
     }
 
-    HEADERS["Authorization"] = authData
-    response = requests.patch(url=URL, json=PAYLOAD, headers=HEADERS, impersonate="chrome110")
-    if response.status_code not in [200, 204]:
-        raise Exception(f"portalsmp: editOffer(): Error: status_code: {response.status_code}, response_text: {response.text}")
-    return None if response.status_code == 204 else response.json()
+    return APIRequest("editOffer", "PATCH", URL, authData, PAYLOAD, ok=(200, 204))
 
+@endpoint
 def myReceivedOffers(offset: int = 0, limit: int = 20, authData: str = ""):
     """
     Retrieves the offers received by the user.
@@ -1064,14 +1089,9 @@ def myReceivedOffers(offset: int = 0, limit: int = 20, authData: str = ""):
     if authData == "":
         raise Exception("portalsmp: myReceivedOffers(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myReceivedOffers(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json()['top_offers'] if 'top_offers' in response.json() else response.json()
+    return APIRequest("myReceivedOffers", "GET", URL, authData, result=lambda data: data['top_offers'] if 'top_offers' in data else data)
 
+@endpoint
 def myCollectionOffers(authData: str = ""):
     """
     Retrieves the collection offers placed by the user.
@@ -1091,14 +1111,9 @@ def myCollectionOffers(authData: str = ""):
     if authData == "":
         raise Exception("portalsmp: myCollectionOffers(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL, headers=HEADERS, impersonate="chrome110")
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: myCollectionOffers(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("myCollectionOffers", "GET", URL, authData)
 
+@endpoint
 def topOffer(gift_name: str = "", authData: str = ""):
     """
     Retrieves the top offer for a specified gift collection.
@@ -1125,11 +1140,4 @@ def topOffer(gift_name: str = "", authData: str = ""):
     if authData == "":
         raise Exception("portalsmp: topOffer(): Error: authData is required")
 
-    HEADERS["Authorization"] = authData
-
-    response = requests.get(URL + f"{ID}/top", headers=HEADERS, impersonate="chrome110")
-
-    if response.status_code != 200:
-        raise Exception(f"portalsmp: topOffer(): Error: status_code: {response.status_code}, response_text: {response.text}")
-
-    return response.json() if response.status_code == 200 else None
+    return APIRequest("topOffer", "GET", URL + f"{ID}/top", authData)
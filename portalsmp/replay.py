@@ -0,0 +1,227 @@
+import json
+import gzip
+import time
+import zlib
+import asyncio
+import threading
+import contextlib
+from collections import Counter, defaultdict, deque
+from portalsmp import portalsapi
+
+_tape = None
+
+def current():
+    """
+    Returns the active Recorder or Replayer, or None. Checked by PortalsSession and AsyncPortalsClient
+    on every request.
+    """
+    return _tape
+
+def clock() -> float:
+    """
+    Current time as the Portals traffic sees it: while a Replayer is active, the recording time of
+    the response it served last (the tape's clock); otherwise time.time(). ActivityFeed and the
+    bot's scheduler read it, so freshness cutoffs and rates behave during a replay as they did live.
+    """
+    tape = _tape
+    if tape is not None and tape.replaying and tape.t is not None:
+        return tape.t
+    return time.time()
+
+def _key(method: str, url: str, payload) -> tuple:
+    # URLs are stored relative to API_URL, so a tape replays against any base URL (e.g. a fake server).
+    path = url.removeprefix(portalsapi.API_URL)
+    return method, path, json.dumps(payload, sort_keys=True) if payload is not None else ""
+
+class Recorder:
+    """
+    Appends every Portals API request and its response to a gzip-compressed JSON Lines archive.
+
+    Each line holds the endpoint name, method, URL (relative to API_URL), payload, status, latency,
+    the Cloudflare-relevant response headers and the body. authData is not recorded. The stream is
+    flushed at most every `flush_sec` seconds, so an archive cut short by a crash stays readable up
+    to the last flush. Appending to an existing archive adds a new gzip member.
+
+    Args:
+        path (str): Archive path (e.g. "traffic.jsonl.gz").
+        flush_sec (float): Maximum seconds between flushes. Defaults to 1.
+
+    Attributes:
+        records (int): Responses recorded.
+    """
+    replaying = False
+
+    def __init__(self, path: str, flush_sec: float = 1):
+        self.path = path
+        self.flush_sec = flush_sec
+        self.records = 0
+        self._file = gzip.open(path, "ab")
+        self._lock = threading.Lock()
+        self._flushed = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, request, response, elapsed: float):
+        headers = {name: response.headers.get(name) for name in ("content-type", "cf-mitigated") if response.headers.get(name)}
+        method, path, _ = _key(request.method, request.url, None)
+        line = json.dumps({
+            "t": time.time(),
+            "name": request.name,
+            "method": method,
+            "url": path,
+            "payload": request.payload,
+            "status": response.status_code,
+            "elapsed": round(elapsed, 6),
+            "headers": headers,
+            "body": response.content.decode("utf-8", "surrogateescape"),
+        }).encode() + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self.records += 1
+            now = time.monotonic()
+            if now - self._flushed >= self.flush_sec:
+                self._file.flush(zlib.Z_SYNC_FLUSH)
+                self._flushed = now
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class _Response:
+    # The parts of a curl_cffi Response that portalsapi._result and is_challenge read.
+    __slots__ = ("status_code", "content", "headers")
+
+    def __init__(self, status_code: int, content: bytes, headers: dict):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+def read_archive(path: str):
+    """
+    Yields the records of an archive in order, stopping quietly at a truncated end.
+    """
+    with gzip.open(path, "rb") as file:
+        try:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, zlib.error):
+            return
+
+class Replayer:
+    """
+    Serves recorded responses instead of making requests.
+
+    Requests are matched on method, URL (relative to API_URL) and payload. Identical requests get
+    their recorded responses in recording order; once those run out, the last one is repeated, so a
+    replay is deterministic however many times the bot polls. With `speed`, each response is delayed
+    by its recorded latency divided by `speed` (speed=10 replays ten times faster than live);
+    without it responses are immediate.
+
+    The recording time of the last served response is the replay clock (see clock()), and `repeats`
+    shows which endpoints have run out of recorded responses.
+
+    Args:
+        path (str): Archive written by Recorder.
+        speed (float | None): Time compression factor for recorded latencies. Defaults to None (no delay).
+
+    Attributes:
+        hits (int): Requests answered from the archive.
+        misses (int): Requests with no recorded response.
+        t (float | None): Recording time of the last served response.
+        repeats (Counter): Per endpoint name, requests answered by repeating the last response.
+    """
+    replaying = True
+
+    def __init__(self, path: str, speed: float | None = None):
+        self.path = path
+        self.speed = speed
+        self.hits = 0
+        self.misses = 0
+        self.t = None
+        self.repeats = Counter()
+        self._responses = defaultdict(deque)
+        self._last = {}
+        self._lock = threading.Lock()
+        for record in read_archive(path):
+            key = _key(record["method"], record["url"], record.get("payload"))
+            self._responses[key].append((
+                _Response(record["status"], record["body"].encode("utf-8", "surrogateescape"), record.get("headers") or {}),
+                record.get("elapsed") or 0.0,
+                record.get("t"),
+            ))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def _next(self, request) -> tuple:
+        key = _key(request.method, request.url, request.payload)
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                self._last[key] = entry = queue.popleft()
+            else:
+                entry = self._last.get(key)
+                if entry is not None:
+                    self.repeats[request.name] += 1
+            if entry is None:
+                self.misses += 1
+                raise Exception(f"portalsmp: {request.name}(): Error: no recorded response for {request.method} {key[1]}")
+            self.hits += 1
+            if entry[2] is not None and (self.t is None or entry[2] > self.t):
+                self.t = entry[2]
+        return entry
+
+    def respond(self, request) -> _Response:
+        response, elapsed, _ = self._next(request)
+        if self.speed:
+            time.sleep(elapsed / self.speed)
+        return response
+
+    async def arespond(self, request) -> _Response:
+        response, elapsed, _ = self._next(request)
+        if self.speed:
+            await asyncio.sleep(elapsed / self.speed)
+        return response
+
+@contextlib.contextmanager
+def recording(path: str, flush_sec: float = 1):
+    """
+    Records all Portals API traffic of the process to `path` for the duration of the block.
+    """
+    global _tape
+    previous = _tape
+    with Recorder(path, flush_sec) as recorder:
+        _tape = recorder
+        try:
+            yield recorder
+        finally:
+            _tape = previous
+
+@contextlib.contextmanager
+def replaying(path: str, speed: float | None = None):
+    """
+    Answers all Portals API requests of the process from the archive at `path` for the duration of the block.
+
+    Example:
+        with replaying("traffic.jsonl.gz", speed=20):
+            asyncio.run(monitor_loop())
+    """
+    global _tape
+    previous = _tape
+    _tape = replayer = Replayer(path, speed)
+    try:
+        yield replayer
+    finally:
+        _tape = previous
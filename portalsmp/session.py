@@ -0,0 +1,144 @@
+import time
+import threading
+from functools import wraps
+from curl_cffi import requests
+from portalsmp import replay
+from portalsmp.metrics import observe_request
+from portalsmp.portalsapi import ENDPOINTS, HEADERS, APIRequest, _prepare, _result
+
+class PortalsSession:
+    """
+    Blocking Portals API session.
+
+    Owns a pool of persistent curl_cffi Sessions (keep-alive connections, TLS sessions) sharing one
+    cookie jar, and a header set. Every endpoint from portalsapi (search, myBalances, topOffer, ...)
+    is available as a method with the same arguments and return value. The module-level functions
+    run on one default session, so plain loops over them reuse connections as well.
+
+    Each request borrows an idle curl_cffi Session from the pool (creating one only when all are in
+    use) and returns it afterwards, so a thread pool of any size never holds more Sessions than it
+    has requests in flight, and threads come and go without leaving Sessions behind. The
+    Authorization header is attached per request and never stored, so one PortalsSession (or
+    several, one per account) can be shared by a thread pool without calls crossing over. Cookies
+    (e.g. Cloudflare clearance) are shared by all requests of the session.
+
+    Args:
+        authData (str): Default authData used when a method is called without one.
+        headers (dict | None): Header set for this session. Defaults to a copy of HEADERS.
+        timeout (float): Request timeout in seconds. Defaults to 30.
+        impersonate (str): Browser to impersonate. Defaults to "chrome110".
+        decoder (Callable | None): Response body decoder (bytes -> object). Defaults to portalsapi.json_loads.
+        max_idle (int): Idle curl_cffi Sessions kept for reuse; extra ones are closed. Defaults to 10.
+
+    Attributes:
+        cookies (Cookies): The shared cookie jar.
+
+    Example:
+        with PortalsSession(authData) as session:
+            while True:
+                balances = session.myBalances()
+    """
+    def __init__(self, authData: str = "", headers: dict | None = None, timeout: float = 30, impersonate: str = "chrome110", decoder=None, max_idle: int = 10):
+        self.authData = authData
+        self.decoder = decoder
+        self.headers = dict(HEADERS) if headers is None else headers
+        self.max_idle = max_idle
+        self.cookies = requests.Cookies()
+        self._impersonate = impersonate
+        self._timeout = timeout
+        self._idle = []
+        self._busy = set()
+        self._retired = set()
+        self._lock = threading.Lock()
+
+    def _checkout(self) -> requests.Session:
+        with self._lock:
+            if self._idle:
+                session = self._idle.pop()
+                self._busy.add(session)
+                return session
+        # The pool lends a Session to one request at a time, so its Curl handle (and connection cache)
+        # is shared by whichever thread borrows it instead of curl_cffi's one handle per thread.
+        session = requests.Session(impersonate=self._impersonate, timeout=self._timeout, cookies=self.cookies.jar,
+                                   use_thread_local_curl=False)
+        with self._lock:
+            self._busy.add(session)
+        return session
+
+    def _checkin(self, session: requests.Session):
+        with self._lock:
+            self._busy.discard(session)
+            if session in self._retired:
+                self._retired.discard(session)
+            elif len(self._idle) < self.max_idle:
+                # most recently used last, so the warmest connection is reused first
+                self._idle.append(session)
+                return
+        session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Closes idle Sessions now and Sessions still in use when their request finishes.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._retired |= self._busy
+        for session in idle:
+            session.close()
+
+    def send(self, request: APIRequest):
+        """
+        Executes a prepared APIRequest and returns the endpoint result.
+        """
+        headers = {**self.headers, "Authorization": request.authData}
+
+        tape = replay.current()
+        started = time.perf_counter()
+        try:
+            if tape is not None and tape.replaying:
+                response = tape.respond(request)
+            else:
+                session = self._checkout()
+                try:
+                    response = session.request(request.method, request.url, json=request.payload, headers=headers)
+                finally:
+                    self._checkin(session)
+        except Exception:
+            observe_request(request.name, "error", time.perf_counter() - started)
+            raise
+        elapsed = time.perf_counter() - started
+        observe_request(request.name, response.status_code, elapsed, len(response.content))
+        if tape is not None and not tape.replaying:
+            tape.record(request, response, elapsed)
+        return _result(request, response, self.decoder)
+
+def _method(build):
+    @wraps(build)
+    def method(self, *args, **kwargs):
+        return self.send(_prepare(build, self.authData, args, kwargs))
+    return method
+
+for _name, _build in ENDPOINTS.items():
+    setattr(PortalsSession, _name, _method(_build))
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_session() -> PortalsSession:
+    """
+    Returns the default session, used by the module-level functions from every thread.
+
+    It reads the module-level HEADERS dict on every request, so changes to HEADERS apply to it.
+    """
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = PortalsSession(headers=HEADERS)
+    return _default
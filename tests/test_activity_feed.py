@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timezone
+from portalsmp import replay
+from portalsmp.activity_feed import ActivityFeed
+
+def make_action(number: int, created: float) -> dict:
+    return {
+        "id": f"action-{number}",
+        "type": "buy",
+        "amount": "1",
+        "created_at": datetime.fromtimestamp(created, timezone.utc).isoformat().replace("+00:00", "Z"),
+    }
+
+class FakeClient:
+    """marketActivity(sort="latest") over a list of actions, newest first."""
+    def __init__(self):
+        self.actions = []
+
+    async def marketActivity(self, sort="latest", offset=0, limit=20, **filters):
+        return self.actions[offset:offset + limit]
+
+def test_fresh_sec_only_limits_the_first_poll(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(replay.time, "time", lambda: now[0])
+    client = FakeClient()
+    client.actions = [make_action(2, now[0] - 10), make_action(1, now[0] - 300)]
+    feed = ActivityFeed(client, limit=20, fresh_sec=60)
+
+    first = asyncio.run(feed.poll())
+    assert [a["id"] for a in first] == ["action-2"]
+
+    # New actions arrive right after the first poll; the next poll comes 120 s later, when they are
+    # already older than fresh_sec, but they were never returned and must not be dropped.
+    client.actions = [make_action(4, now[0] + 5), make_action(3, now[0] + 1)] + client.actions
+    now[0] += 120
+    second = asyncio.run(feed.poll())
+    assert [a["id"] for a in second] == ["action-3", "action-4"]
+
+    now[0] += 120
+    assert asyncio.run(feed.poll()) == []
+
+def test_resume_skips_actions_of_a_previous_run(monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(replay.time, "time", lambda: now)
+    client = FakeClient()
+    client.actions = [make_action(3, now - 1), make_action(2, now - 5), make_action(1, now - 9)]
+    feed = ActivityFeed(client, limit=20, fresh_sec=60)
+    feed.resume(["action-1", "action-2"], newest=now - 5)
+    assert [a["id"] for a in asyncio.run(feed.poll())] == ["action-3"]
@@ -0,0 +1,119 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from curl_cffi import requests
+import portalsmp as pm
+from portalsmp import session as session_module
+from portalsmp.pagination import iter_search
+from portalsmp.portalsapi import HEADERS
+
+class FakeResponse:
+    def __init__(self, content: bytes):
+        self.status_code = 200
+        self.content = content
+        self.headers = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+class FakeTransport:
+    """
+    Stands in for curl_cffi.requests.Session: records every request and answers with a cookie
+    naming the account (Authorization) it was sent with.
+    """
+    created = []
+    sent = []
+    lock = threading.Lock()
+
+    def __init__(self, impersonate=None, timeout=None, cookies=None, use_thread_local_curl=True):
+        self.cookies = requests.Cookies(cookies)
+        with self.lock:
+            self.created.append(self)
+
+    def request(self, method, url, json=None, headers=None):
+        sent = {"thread": threading.current_thread().name, "headers": dict(headers), "cookies": dict(self.cookies)}
+        with self.lock:
+            self.sent.append(sent)
+        self.cookies.set("account", headers["Authorization"])
+        if "nfts/search" in url:
+            offset = int(url.split("offset=")[1].split("&")[0])
+            ids = range(offset, offset + 20) if offset < 60 else ()
+            return FakeResponse(b'{"results": [' + b",".join(b'{"id": "%d"}' % i for i in ids) + b"]}")
+        return FakeResponse(b'{"balance": "1.0"}')
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def transport(monkeypatch):
+    FakeTransport.created = []
+    FakeTransport.sent = []
+    monkeypatch.setattr(session_module.requests, "Session", FakeTransport)
+    monkeypatch.setattr(session_module, "_default", None)
+    return FakeTransport
+
+def test_default_session_keeps_authorization_per_thread(transport):
+    def run(worker: int):
+        auth = f"tma user-{worker}"
+        threading.current_thread().name = auth
+        for _ in range(50):
+            pm.myBalances(authData=auth)
+
+    threads = [threading.Thread(target=run, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(transport.sent) == 8 * 50
+    for sent in transport.sent:
+        assert sent["headers"]["Authorization"] == sent["thread"]
+    assert HEADERS["Authorization"] == ""
+    assert session_module.default_session().headers["Authorization"] == ""
+    # one pooled transport per request in flight at most, not one per thread ever seen
+    assert len(transport.created) <= 8
+
+def test_sessions_do_not_share_cookies_or_headers(transport):
+    accounts = {auth: pm.PortalsSession(auth) for auth in ("tma alice", "tma bob")}
+
+    def run(auth: str):
+        threading.current_thread().name = auth
+        for _ in range(20):
+            accounts[auth].myBalances()
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(run, ["tma alice", "tma bob"] * 4))
+
+    for sent in transport.sent:
+        assert sent["headers"]["Authorization"] == sent["thread"]
+        assert sent["cookies"].get("account", sent["thread"]) == sent["thread"]
+    for auth, session in accounts.items():
+        assert dict(session.cookies) == {"account": auth}
+        assert session.headers["Authorization"] == ""
+
+def test_iter_search_reuses_threads_and_transports(transport):
+    for _ in range(30):
+        items = list(iter_search(prefetch=2, authData="tma x"))
+        assert [item["id"] for item in items] == [str(i) for i in range(60)]
+    threads = {sent["thread"] for sent in transport.sent}
+    assert len(threads) <= 8
+    assert len(transport.created) <= 8
+
+def test_pooled_session_keeps_its_curl_handle_across_threads():
+    session = pm.PortalsSession("tma x")
+    handles = []
+
+    def borrow():
+        pooled = session._checkout()
+        handles.append((pooled, pooled.curl))
+        session._checkin(pooled)
+
+    for _ in range(3):
+        thread = threading.Thread(target=borrow)
+        thread.start()
+        thread.join()
+    session.close()
+
+    assert len({id(pooled) for pooled, _ in handles}) == 1
+    assert len({id(curl) for _, curl in handles}) == 1